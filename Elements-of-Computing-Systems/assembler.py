@@ -5,19 +5,25 @@
 #
 #     Authors: David C. Drake (https://davidcdrake.com) and Shawn Redmond
 #
-# Description: Functions for parsing and translating a Hack assembly code file
-#              to produce a Hack machine code file according to the
-#              specifications outlined in "The Elements of Computing Systems,"
-#              by Nisan and Schocken (MIT Press, 2005). Developed using Python
-#              2.7.
+# Description: An 'Assembler' class and a collection of functions for parsing
+#              and translating a Hack assembly code file to produce a Hack
+#              machine code file according to the specifications outlined in
+#              "The Elements of Computing Systems," by Nisan and Schocken (MIT
+#              Press, 2005). Developed using Python 2.7.
 #-------------------------------------------------------------------------------
 
 import sys
 import os.path
+import array
+import glob
+import hashlib
+import json
+import multiprocessing
+import time
 
 DEBUG = False
 
-global nextAvailableMemoryLocation
+ROM_SIZE = 2 ** 15
 
 PREDEFINED_SYMBOLS = {
     'SP':     0,
@@ -45,11 +51,7 @@ PREDEFINED_SYMBOLS = {
     'KBD':    24576,
 }
 
-nextAvailableMemoryLocation = PREDEFINED_SYMBOLS['R15'] + 1
-
-VARIABLE_SYMBOLS = {}
-
-LABEL_SYMBOLS = {}
+FIRST_VARIABLE_ADDRESS = PREDEFINED_SYMBOLS['R15'] + 1
 
 DESTINATIONS = {
     '':    '000',
@@ -104,6 +106,28 @@ COMPUTATIONS = {
     'D|M': '010101',
 }
 
+# The fields of the tables above as integers, already shifted into position
+# ('a' bit included), for building machine code words via bitwise OR:
+C_INSTRUCTION_PREFIX = 0x7 << 13
+
+COMPUTATION_CODES = dict((comp, int(str(int('M' in comp)) + bits, 2) << 6)
+                         for (comp, bits) in COMPUTATIONS.items())
+
+DESTINATION_CODES = dict((dest, int(bits, 2) << 3)
+                         for (dest, bits) in DESTINATIONS.items())
+
+JUMP_CODES = dict((jump, int(bits, 2)) for (jump, bits) in JUMPS.items())
+
+# Output formats for machine code, and the file extension of each:
+OUTPUT_FORMATS = {
+    'text': '.hack',
+    'hex':  '.hex',
+    'le':   '.bin',
+    'be':   '.be.bin',
+}
+
+ASSEMBLY_CACHE_FILENAME = '.assembler_cache.json'
+
 #-------------------------------------------------------------------------------
 #    Function: parse
 #
@@ -193,7 +217,7 @@ def parseLine(line, lineNum):
         if DEBUG:
             print 'L-instruction'
         symbol = line[1:len(line) - 1:]
-        if not isSymbol(symbol) or isReservedOrIsLabel(symbol):
+        if not isSymbol(symbol) or isReserved(symbol):
             fail('invalid label', lineNum, line)
 
         return ('L_INSTRUCTION', symbol, line, lineNum)
@@ -220,140 +244,354 @@ def parseLine(line, lineNum):
     return ('C_INSTRUCTION', dest, comp, jump, line, lineNum)
 
 #-------------------------------------------------------------------------------
-#    Function: processSymbols
-#
-# Description: Searches for L-instructions (user-defined labels) within a list
-#              of parsed Hack assembly instructions. If any are found, they are
-#              added to the symbol table with the line number of the next
-#              instruction as their value (unless they have already been
-#              defined in a previous L-instruction, in which case an error
-#              message is presented and the program exits).
+#       Class: Assembler
 #
-#      Inputs: parsedCodeList - A list of tuples representing parsed assembly
-#                               instructions.
-#
-#     Outputs: None. However, labels may be added to the LABEL_SYMBOLS
-#              dictionary.
+# Description: Translates Hack assembly code into Hack machine code. The label
+#              and variable symbol tables belong to the Assembler object and
+#              are reset at the start of each run, so a single (long-lived)
+#              Assembler may translate any number of programs in turn, and
+#              separate Assemblers may run concurrently in different threads
+#              or processes.
 #-------------------------------------------------------------------------------
-def processSymbols(parsedCodeList):
-    if DEBUG:
-        print 'Processing symbols in parsed code...'
-
-    lineNum = 0
-    for line in parsedCodeList:
-        if line[0] is 'L_INSTRUCTION':
-            label = line[1]
-            if isReservedOrIsLabel(label):
-                fail('label defined more than once', line[3], line[2])
-            if DEBUG:
-                print '\tLabel "' + label + '" set to ' + str(lineNum)
-            LABEL_SYMBOLS[label] = lineNum
-        else:
+class Assembler:
+    #--------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Initializes the Assembler object with empty symbol tables.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #--------------------------------------------------------------------------
+    def __init__(self):
+        self.reset()
+
+    #--------------------------------------------------------------------------
+    #      Method: reset
+    #
+    # Description: Clears the label and variable symbol tables, so that the
+    #              next variable encountered is allocated the first address
+    #              following the predefined registers R0 through R15.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #--------------------------------------------------------------------------
+    def reset(self):
+        self.labelSymbols = {}
+        self.variableSymbols = {}
+        self.nextAvailableMemoryLocation = FIRST_VARIABLE_ADDRESS
+
+    #--------------------------------------------------------------------------
+    #      Method: assemble
+    #
+    # Description: Assembles a Hack assembly program in a single streaming
+    #              pass: each line is parsed and translated as soon as it is
+    #              read, and the resulting machine code is stored in an array
+    #              of integers, preallocated to the size of the Hack ROM (and
+    #              doubled if necessary). A-instructions referring to symbols
+    #              that are not yet defined are recorded and backpatched when
+    #              the label is defined; any still undefined at the end of the
+    #              program are variables, which are allocated memory in order
+    #              of first appearance (exactly as 'translate' does). No source
+    #              text is kept once a line has been checked for errors. The
+    #              symbol tables are reset before assembly begins.
+    #
+    #      Inputs: source - A string, an open file handle, or any iterable of
+    #                       lines containing assembly code.
+    #
+    #     Outputs: An array of unsigned 16-bit integers, one per machine code
+    #              instruction. If an error is detected, an 'AssemblyError' is
+    #              raised.
+    #--------------------------------------------------------------------------
+    def assemble(self, source):
+        self.reset()
+        if isinstance(source, basestring):
+            source = source.splitlines(True)
+
+        words = array.array('H', [0]) * ROM_SIZE
+        count = 0
+        forwardReferences = {}
+        undefinedSymbols = []
+        lineNum = 0
+        for line in source:
             lineNum += 1
+            parsedLine = parseLine(line, lineNum)
+            if not parsedLine:
+                continue
+
+            # L-instructions (backpatch any earlier references to the label):
+            if parsedLine[0] == 'L_INSTRUCTION':
+                label = parsedLine[1]
+                if self.isReservedOrIsLabel(label):
+                    fail('label defined more than once', lineNum,
+                         parsedLine[2])
+                if count >= ROM_SIZE:
+                    fail('label address exceeds ROM size', lineNum,
+                         parsedLine[2])
+                self.labelSymbols[label] = count
+                for address in forwardReferences.pop(label, []):
+                    words[address] = count
+                continue
+
+            if count == len(words):
+                words.extend(array.array('H', [0]) * len(words))
+
+            # A-instructions:
+            if parsedLine[0] == 'A_INSTRUCTION':
+                symbol = parsedLine[1]
+                if isConstant(symbol):
+                    words[count] = int(symbol)
+                elif symbol in PREDEFINED_SYMBOLS:
+                    words[count] = PREDEFINED_SYMBOLS[symbol]
+                elif symbol in self.labelSymbols:
+                    words[count] = self.labelSymbols[symbol]
+                else:
+                    if symbol not in forwardReferences:
+                        forwardReferences[symbol] = array.array('I')
+                        undefinedSymbols.append(symbol)
+                    forwardReferences[symbol].append(count)
+
+            # C-instructions:
+            else:
+                words[count] = encodeCInstruction(parsedLine[1],
+                                                  parsedLine[2],
+                                                  parsedLine[3])
+            count += 1
+
+        # Symbols never defined as labels are variables:
+        for symbol in undefinedSymbols:
+            if symbol not in forwardReferences:
+                continue
+            value = self.getVariableAddress(symbol)
+            for address in forwardReferences[symbol]:
+                words[address] = value
+
+        del words[count:]
+        if DEBUG:
+            print 'Assembled ' + str(count) + ' instructions'
+
+        return words
+
+    #--------------------------------------------------------------------------
+    #      Method: processSymbols
+    #
+    # Description: Searches for L-instructions (user-defined labels) within a
+    #              list of parsed Hack assembly instructions. If any are found,
+    #              they are added to the symbol table with the line number of
+    #              the next instruction as their value (unless they have
+    #              already been defined in a previous L-instruction, in which
+    #              case an 'AssemblyError' is raised).
+    #
+    #      Inputs: parsedCodeList - A list of tuples representing parsed
+    #                               assembly instructions.
+    #
+    #     Outputs: None. However, labels may be added to the label symbol
+    #              table.
+    #--------------------------------------------------------------------------
+    def processSymbols(self, parsedCodeList):
+        if DEBUG:
+            print 'Processing symbols in parsed code...'
+
+        lineNum = 0
+        for line in parsedCodeList:
+            if line[0] is 'L_INSTRUCTION':
+                label = line[1]
+                if self.isReservedOrIsLabel(label):
+                    fail('label defined more than once', line[3], line[2])
+                if DEBUG:
+                    print '\tLabel "' + label + '" set to ' + str(lineNum)
+                self.labelSymbols[label] = lineNum
+            else:
+                lineNum += 1
+
+    #--------------------------------------------------------------------------
+    #      Method: translate
+    #
+    # Description: Given a list of tuples representing parsed Hack assembly
+    #              instructions, a list of strings containing corresponding
+    #              machine code instructions is produced. Only A-instructions
+    #              and C-instructions are translated: L-instructions are
+    #              ignored.
+    #
+    #      Inputs: parsedCodeList - A list of tuples representing parsed
+    #                               assembly instructions.
+    #
+    #     Outputs: A list of strings containing Hack machine code instructions.
+    #--------------------------------------------------------------------------
+    def translate(self, parsedCodeList):
+        if DEBUG:
+            print 'Translating parsed code...'
+
+        machineCode = []
+        for line in parsedCodeList:
+            if line[0] is not 'L_INSTRUCTION':
+                machineCode.append(self.translateLine(line))
+
+        if DEBUG:
+            print 'Translated machine code:'
+            for i in range(len(machineCode)):
+                print '\tLine ' + str(i) + ': \t' + str(machineCode[i])
+
+        return machineCode
+
+    #--------------------------------------------------------------------------
+    #      Method: translateLine
+    #
+    # Description: Translates a single parsed A-instruction or C-instruction
+    #              into a string of sixteen '0' and '1' characters.
+    #
+    #      Inputs: line - A tuple representing a parsed assembly instruction.
+    #
+    #     Outputs: A string containing a Hack machine code instruction (or an
+    #              empty string in the case of invalid input).
+    #--------------------------------------------------------------------------
+    def translateLine(self, line):
+        if DEBUG:
+            print '\tTranslating line: ' + str(line)
+
+        instruction = ''
+
+        # A-instructions:
+        if line[0] is 'A_INSTRUCTION':
+            if isConstant(line[1]):
+                value = int(line[1])
+            else:
+                symbol = line[1]
+                if symbol in PREDEFINED_SYMBOLS:
+                    value = PREDEFINED_SYMBOLS[symbol]
+                elif symbol in self.labelSymbols:
+                    value = self.labelSymbols[symbol]
+                else:
+                    value = self.getVariableAddress(symbol)
+            instruction = '{0:016b}'.format(value)
+
+        # C-instructions:
+        elif line[0] is 'C_INSTRUCTION':
+            instruction = '{0:016b}'.format(encodeCInstruction(line[1],
+                                                               line[2],
+                                                               line[3]))
+
+        # Invalid input:
+        elif DEBUG:
+            print '\tInvalid instruction passed to translateLine(): ' + \
+                  str(line)
+
+        return instruction
+
+    #--------------------------------------------------------------------------
+    #      Method: getVariableAddress
+    #
+    # Description: Returns the RAM address of a variable, allocating the next
+    #              available address if the variable has not been seen before.
+    #
+    #      Inputs: symbol - A string containing a user-defined variable.
+    #
+    #     Outputs: The variable's RAM address, as an integer.
+    #--------------------------------------------------------------------------
+    def getVariableAddress(self, symbol):
+        if symbol not in self.variableSymbols:
+            self.variableSymbols[symbol] = self.nextAvailableMemoryLocation
+            self.nextAvailableMemoryLocation += 1
+
+        return self.variableSymbols[symbol]
+
+    #--------------------------------------------------------------------------
+    #      Method: isReservedOrIsLabel
+    #
+    # Description: Determines whether a given string is a reserved word within
+    #              the Hack assembly language or was previously defined as a
+    #              label.
+    #
+    #      Inputs: s - A string containing a user-defined label or variable.
+    #
+    #     Outputs: 'True' if the string is reserved or is a user-defined label,
+    #              'False' otherwise.
+    #--------------------------------------------------------------------------
+    def isReservedOrIsLabel(self, s):
+        return isReserved(s) or s in self.labelSymbols
 
 #-------------------------------------------------------------------------------
-#    Function: translate
+#    Function: assemble
 #
-# Description: Given a list of tuples representing parsed Hack assembly
-#              instructions, a list of strings containing corresponding machine
-#              code instructions is produced. Only A-instructions and
-#              C-instructions are translated: L-instructions are ignored.
+# Description: Assembles a Hack assembly program with a new 'Assembler'.
 #
-#      Inputs: parsedCodeList - A list of tuples representing parsed assembly
-#                               instructions.
+#      Inputs: source - A string, an open file handle, or any iterable of lines
+#                       containing assembly code.
 #
-#     Outputs: A list of strings containing Hack machine code instructions.
+#     Outputs: An array of unsigned 16-bit integers, one per machine code
+#              instruction. If an error is detected, an 'AssemblyError' is
+#              raised.
 #-------------------------------------------------------------------------------
-def translate(parsedCodeList):
-    if DEBUG:
-        print 'Translating parsed code...'
-
-    machineCode = []
-    for line in parsedCodeList:
-        if line[0] is not 'L_INSTRUCTION':
-            machineCode.append(translateLine(line))
-
-    if DEBUG:
-        print 'Translated machine code:'
-        for i in range(len(machineCode)):
-            print '\tLine ' + str(i) + ': \t' + str(machineCode[i])
-
-    return machineCode
+def assemble(source):
+    return Assembler().assemble(source)
 
 #-------------------------------------------------------------------------------
-#    Function: translateLine
+#    Function: encodeCInstruction
 #
-# Description: Given a list of tuples representing parsed Hack assembly
-#              instructions, a list of strings containing corresponding machine
-#              code instructions is produced. Only A-instructions and
-#              C-instructions are translated: L-instructions are ignored.
+# Description: Encodes the fields of a C-instruction as a machine code word.
 #
-#      Inputs: line - A tuple representing a parsed assembly instruction.
+#      Inputs: dest - The instruction's destination (e.g., 'AM'), or ''.
+#              comp - The instruction's computation (e.g., 'D+M').
+#              jump - The instruction's jump command (e.g., 'JGT'), or ''.
 #
-#     Outputs: A string containing a Hack machine code instruction (or an empty
-#              string in the case of invalid input).
+#     Outputs: The 16-bit machine code instruction, as an integer.
 #-------------------------------------------------------------------------------
-def translateLine(line):
-    if DEBUG:
-        print '\tTranslating line: ' + str(line)
-
-    global nextAvailableMemoryLocation
+def encodeCInstruction(dest, comp, jump):
+    return C_INSTRUCTION_PREFIX | COMPUTATION_CODES[comp] | \
+           DESTINATION_CODES[dest] | JUMP_CODES[jump]
 
-    instruction = ''
-
-    # A-instructions:
-    if line[0] is 'A_INSTRUCTION':
-        instruction += '0'
-        if isConstant(line[1]):
-            value = int(line[1])
-        else:
-            symbol = line[1]
-            if symbol in PREDEFINED_SYMBOLS:
-                value = PREDEFINED_SYMBOLS[symbol]
-            elif symbol in LABEL_SYMBOLS:
-                value = LABEL_SYMBOLS[symbol]
-            else:
-                if symbol not in VARIABLE_SYMBOLS:
-                    VARIABLE_SYMBOLS[symbol] = nextAvailableMemoryLocation
-                    nextAvailableMemoryLocation += 1
-                value = VARIABLE_SYMBOLS[symbol]
-        value = bin(value)[:1:-1]
-        while len(value) < 15:
-            value += '0'
-        value = value[::-1]
-        instruction += value
-
-    # C-instructions:
-    elif line[0] is 'C_INSTRUCTION':
-        instruction += '111'
-        if 'M' in line[2]:
-            instruction += '1'
-        else:
-            instruction += '0'
-        instruction += COMPUTATIONS[line[2]]
-        instruction += DESTINATIONS[line[1]]
-        instruction += JUMPS[line[3]]
-
-    # Invalid input:
-    elif DEBUG:
-        print '\tInvalid instruction passed to translateLine(): ' + str(line)
-
-    return instruction
+#-------------------------------------------------------------------------------
+#    Function: writeMachineCode
+#
+# Description: Writes machine code to a file in one of the following formats:
+#
+#                   text - One instruction per line, as a string of sixteen
+#                          '0' and '1' characters (the standard '.hack'
+#                          format).
+#
+#                   hex  - One instruction per line, as four hexadecimal
+#                          digits.
+#
+#                   le   - A raw ROM image: two bytes per instruction, least
+#                          significant byte first (the '.bin' format).
+#
+#                   be   - A raw ROM image: two bytes per instruction, most
+#                          significant byte first (the '.be.bin' format).
+#
+#      Inputs: fout         - An open output file handle (opened in binary
+#                             mode for the 'le' and 'be' formats).
+#              words        - A sequence of 16-bit machine code instructions,
+#                             as integers.
+#              outputFormat - One of the keys of OUTPUT_FORMATS ('text' by
+#                             default).
+#
+#     Outputs: None. However, machine code is written to the output file.
+#-------------------------------------------------------------------------------
+def writeMachineCode(fout, words, outputFormat='text'):
+    if outputFormat == 'text':
+        fout.writelines('{0:016b}\n'.format(word) for word in words)
+    elif outputFormat == 'hex':
+        fout.writelines('{0:04X}\n'.format(word) for word in words)
+    else:
+        image = array.array('H', words)
+        if (outputFormat == 'be') != (sys.byteorder == 'big'):
+            image.byteswap()
+        image.tofile(fout)
 
 #-------------------------------------------------------------------------------
-#    Function: isReservedOrIsLabel
+#    Function: isReserved
 #
 # Description: Determines whether a given string is a reserved word within the
-#              Hack assembly language or was previously defined as a label.
+#              Hack assembly language (a predefined symbol, destination, or
+#              jump command).
 #
 #      Inputs: s - A string containing a user-defined label or variable.
 #
-#     Outputs: 'True' if the string is reserved or is a user-defined label,
-#              'False' otherwise.
+#     Outputs: 'True' if the string is reserved, 'False' otherwise.
 #-------------------------------------------------------------------------------
-def isReservedOrIsLabel(s):
-    return s in PREDEFINED_SYMBOLS or s in DESTINATIONS or s in JUMPS or \
-           s in LABEL_SYMBOLS
+def isReserved(s):
+    return s in PREDEFINED_SYMBOLS or s in DESTINATIONS or s in JUMPS
 
 #-------------------------------------------------------------------------------
 #    Function: isSymbol
@@ -408,7 +646,9 @@ def isConstant(s):
 #-------------------------------------------------------------------------------
 #    Function: fail
 #
-# Description: Prints an informative error message, then exits the program.
+# Description: Reports an error in the assembly code being translated by
+#              raising an 'AssemblyError' (which 'main' presents as an
+#              informative error message before exiting the program).
 #
 #      Inputs: errorMessage     - A string specifying the type of error.
 #              sourceLineNum    - Line number (within the source file) where
@@ -416,12 +656,306 @@ def isConstant(s):
 #              sourceLineString - String containing the code that produced the
 #                                 error.
 #
-#     Outputs: None.
+#     Outputs: None. (Always raises an 'AssemblyError'.)
 #-------------------------------------------------------------------------------
 def fail(errorMessage, sourceLineNum, sourceLineString):
-    print 'Error: ' + errorMessage + ' on line ' + str(sourceLineNum)
-    print '\t' + sourceLineString
-    sys.exit(-1)
+    raise AssemblyError(errorMessage, sourceLineNum, sourceLineString)
+
+#-------------------------------------------------------------------------------
+#       Class: AssemblyError
+#
+# Description: An error detected within Hack assembly code, recording the type
+#              of error and the number and text of the offending source line.
+#              (All three are passed to the base class so that the error can
+#              be pickled, e.g., when raised within a process pool.)
+#-------------------------------------------------------------------------------
+class AssemblyError(Exception):
+    def __init__(self, errorMessage, sourceLineNum, sourceLineString):
+        Exception.__init__(self, errorMessage, sourceLineNum,
+                           sourceLineString)
+        self.errorMessage = errorMessage
+        self.sourceLineNum = sourceLineNum
+        self.sourceLineString = sourceLineString
+
+    def __str__(self):
+        return self.errorMessage + ' on line ' + str(self.sourceLineNum)
+
+#-------------------------------------------------------------------------------
+#    Function: findAssemblyFiles
+#
+# Description: Expands a list of directories, file names, and glob patterns
+#              (e.g., 'programs/*.asm') into a list of assembly (.asm) files.
+#              Each directory contributes every .asm file it contains. Files
+#              are listed in sorted order within each argument, and no file is
+#              listed twice.
+#
+#      Inputs: paths - A list of directory names, file names, and/or glob
+#                      patterns.
+#
+#     Outputs: A list of the names of the .asm files found.
+#-------------------------------------------------------------------------------
+def findAssemblyFiles(paths):
+    filenames = []
+    found = set()
+    for path in paths:
+        if os.path.isdir(path):
+            path = os.path.join(path, '*.asm')
+        for filename in sorted(glob.glob(path)):
+            if filename.endswith('.asm') and os.path.isfile(filename) and \
+                    os.path.abspath(filename) not in found:
+                found.add(os.path.abspath(filename))
+                filenames.append(filename)
+
+    return filenames
+
+#-------------------------------------------------------------------------------
+#    Function: hashFile
+#
+# Description: Computes the SHA-1 hash of a file's contents.
+#
+#      Inputs: filename - Name of the file to be hashed.
+#
+#     Outputs: The hash, as a string of hexadecimal digits, or 'None' if the
+#              file does not exist or cannot be read.
+#-------------------------------------------------------------------------------
+def hashFile(filename):
+    try:
+        fin = open(filename, 'rb')
+    except EnvironmentError:
+        return None
+    try:
+        digest = hashlib.sha1(fin.read()).hexdigest()
+    except EnvironmentError:
+        digest = None
+    fin.close()
+
+    return digest
+
+#-------------------------------------------------------------------------------
+#    Function: loadAssemblyCache
+#
+# Description: Reads the assembly cache of a directory: a JSON file named
+#              ASSEMBLY_CACHE_FILENAME mapping the name of each .asm file
+#              assembled there to the output format used and the hashes of the
+#              source and output files.
+#
+#      Inputs: directory - Name of the directory containing the .asm files.
+#
+#     Outputs: A dictionary containing the cache entries (empty if there is no
+#              cache file or it cannot be read).
+#-------------------------------------------------------------------------------
+def loadAssemblyCache(directory):
+    filename = os.path.join(directory, ASSEMBLY_CACHE_FILENAME)
+    if not os.path.isfile(filename):
+        return {}
+
+    fin = open(filename, 'r')
+    try:
+        cache = json.load(fin)
+    except ValueError:
+        cache = {}
+    fin.close()
+
+    return cache
+
+#-------------------------------------------------------------------------------
+#    Function: saveAssemblyCache
+#
+# Description: Writes the assembly cache of a directory (see
+#              'loadAssemblyCache').
+#
+#      Inputs: directory - Name of the directory containing the .asm files.
+#              cache     - A dictionary containing the cache entries.
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def saveAssemblyCache(directory, cache):
+    fout = open(os.path.join(directory, ASSEMBLY_CACHE_FILENAME), 'w')
+    json.dump(cache, fout, indent=2, separators=(',', ': '), sort_keys=True)
+    fout.write('\n')
+    fout.close()
+
+#-------------------------------------------------------------------------------
+#    Function: getOutputFilename
+#
+# Description: Determines the name of the machine code file corresponding to a
+#              given .asm file.
+#
+#      Inputs: inputFilename - Name of the .asm file.
+#              outputFormat  - One of the keys of OUTPUT_FORMATS.
+#
+#     Outputs: The name of the output file (e.g., 'Prog.hack' for 'Prog.asm').
+#-------------------------------------------------------------------------------
+def getOutputFilename(inputFilename, outputFormat):
+    return inputFilename[:-len('.asm'):] + OUTPUT_FORMATS[outputFormat]
+
+#-------------------------------------------------------------------------------
+#    Function: initAssemblyWorker
+#
+# Description: Initializes an 'assembleFiles' worker process by creating the
+#              'Assembler' it uses for every file it is given.
+#
+#      Inputs: None.
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def initAssemblyWorker():
+    global workerAssembler
+
+    workerAssembler = Assembler()
+
+#-------------------------------------------------------------------------------
+#    Function: assembleFile
+#
+# Description: Assembles a single .asm file and writes its machine code to the
+#              corresponding output file, using the 'Assembler' created by
+#              'initAssemblyWorker'.
+#
+#      Inputs: task - A tuple containing the name of the .asm file and the
+#                     output format (one of the keys of OUTPUT_FORMATS).
+#
+#     Outputs: A tuple containing the name of the .asm file, the number of
+#              instructions assembled (or 'None' if an error was detected),
+#              the time taken in seconds, and the error detected (or 'None'):
+#              either an 'AssemblyError' or, if a file could not be read or
+#              written, a string describing the problem.
+#-------------------------------------------------------------------------------
+def assembleFile(task):
+    (inputFilename, outputFormat) = task
+    startTime = time.time()
+    try:
+        fin = open(inputFilename, 'r')
+        try:
+            machineCode = workerAssembler.assemble(fin)
+        finally:
+            fin.close()
+
+        outputFilename = getOutputFilename(inputFilename, outputFormat)
+        if outputFormat in ('le', 'be'):
+            fout = open(outputFilename, 'wb')
+        else:
+            fout = open(outputFilename, 'w')
+        try:
+            writeMachineCode(fout, machineCode, outputFormat)
+        finally:
+            fout.close()
+    except AssemblyError as error:
+        return (inputFilename, None, time.time() - startTime, error)
+    except EnvironmentError as error:
+        return (inputFilename, None, time.time() - startTime, str(error))
+
+    return (inputFilename, len(machineCode), time.time() - startTime, None)
+
+#-------------------------------------------------------------------------------
+#    Function: assembleFiles
+#
+# Description: Assembles a batch of .asm files in parallel, using a pool of
+#              worker processes. A file is skipped if its directory's assembly
+#              cache (shared by every file in the directory, however the
+#              directory is named) shows that it was previously assembled, in
+#              the same output format, from identical source code to an output
+#              file that has not changed since. A summary line is printed for
+#              each file, giving its instruction count, the time taken to
+#              assemble it (in milliseconds), and whether it was assembled or
+#              cached (or the error detected), followed by the totals for the
+#              batch.
+#
+#      Inputs: filenames    - A list of the names of the .asm files.
+#              outputFormat - One of the keys of OUTPUT_FORMATS ('text' by
+#                             default).
+#              processes    - Number of worker processes to use, or 'None' to
+#                             use one per CPU core. ('None' by default.)
+#
+#     Outputs: The number of files in which errors were detected.
+#-------------------------------------------------------------------------------
+def assembleFiles(filenames, outputFormat='text', processes=None):
+    startTime = time.time()
+
+    # Determine which files must be assembled:
+    caches = {}
+    results = {}
+    tasks = []
+    assembledFilenames = set()
+    sourceHashes = {}
+    for inputFilename in filenames:
+        directory = os.path.abspath(os.path.dirname(inputFilename))
+        if directory not in caches:
+            caches[directory] = loadAssemblyCache(directory)
+        sourceHashes[inputFilename] = hashFile(inputFilename)
+        entry = caches[directory].get(os.path.basename(inputFilename))
+        if entry and entry['format'] == outputFormat and \
+                entry['source'] == sourceHashes[inputFilename] and \
+                entry['output'] == hashFile(getOutputFilename(inputFilename,
+                                                              outputFormat)):
+            results[inputFilename] = (inputFilename, entry['instructions'],
+                                      0.0, None)
+        else:
+            tasks.append((inputFilename, outputFormat))
+            assembledFilenames.add(inputFilename)
+
+    # Assemble them (serially, if a pool would not help):
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    processes = min(processes, len(tasks))
+    if processes > 1:
+        pool = multiprocessing.Pool(processes, initAssemblyWorker)
+        try:
+            for result in pool.imap_unordered(assembleFile, tasks):
+                results[result[0]] = result
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        initAssemblyWorker()
+        for task in tasks:
+            result = assembleFile(task)
+            results[result[0]] = result
+
+    # Update the caches and print a summary:
+    failures = 0
+    instructions = 0
+    assemblyTime = 0.0
+    for inputFilename in filenames:
+        (inputFilename, count, seconds, error) = results[inputFilename]
+        directory = os.path.abspath(os.path.dirname(inputFilename))
+        basename = os.path.basename(inputFilename)
+        if error:
+            failures += 1
+            caches[directory].pop(basename, None)
+            print inputFilename + ': error: ' + str(error)
+            if isinstance(error, AssemblyError):
+                print '\t' + error.sourceLineString
+            continue
+        if inputFilename in assembledFilenames:
+            caches[directory][basename] = {
+                'format':       outputFormat,
+                'instructions': count,
+                'source':       sourceHashes[inputFilename],
+                'output':       hashFile(getOutputFilename(inputFilename,
+                                                           outputFormat)),
+            }
+            status = 'assembled'
+        else:
+            status = 'cached'
+        instructions += count
+        assemblyTime += seconds
+        print inputFilename + '\t' + str(count) + ' instructions\t' + \
+              '%.3f ms' % (seconds * 1000) + '\t' + status
+    for directory in caches:
+        try:
+            saveAssemblyCache(directory, caches[directory])
+        except EnvironmentError as error:
+            print 'Error: the assembly cache of "' + directory + \
+                  '" could not be saved (' + str(error) + ').'
+
+    print 'Total: ' + str(len(filenames)) + ' files (' + \
+          str(len(tasks) - failures) + ' assembled, ' + \
+          str(len(filenames) - len(tasks)) + ' cached, ' + str(failures) + \
+          ' failed)\t' + str(instructions) + ' instructions\t' + \
+          '%.3f ms' % (assemblyTime * 1000) + ' assembling\t' + \
+          '%.3f ms' % ((time.time() - startTime) * 1000) + ' elapsed'
+
+    return failures
 
 #-------------------------------------------------------------------------------
 #    Function: main
@@ -429,22 +963,47 @@ def fail(errorMessage, sourceLineNum, sourceLineString):
 # Description: Processes command line arguments (printing usage information and
 #              exiting if any associated error is detected), then handles the
 #              parsing and translation of an input file as well as the creation
-#              of an output file containing the resulting lines of machine
-#              code (assuming no errors were encountered along the way).
+#              of an output file containing the resulting machine code
+#              (assuming no errors were encountered along the way).
 #
 #      Inputs: An input file must be specified as a command-line argument. It
-#              also must already exist and have a '.asm' extension.
+#              also must already exist and have a '.asm' extension. It may be
+#              followed by an output format: 'text' (the default), 'hex', 'le'
+#              (little-endian binary), or 'be' (big-endian binary).
+#              Alternatively, any number of directories and/or glob patterns
+#              (or more than one file) may be specified, optionally followed
+#              by an output format, to assemble every .asm file found in
+#              parallel (see 'assembleFiles').
 #
 #     Outputs: None. However, if the program completes successfully, an output
-#              file will be created. It will have the same name as the input
-#              file, but with a '.hack' extension rather than '.asm'.
+#              file will be created for each input file. It will have the same
+#              name as the input file, but with the output format's extension
+#              (e.g., '.hack') rather than '.asm'.
 #-------------------------------------------------------------------------------
 def main():
     # Check for correct number and type of arguments:
-    if len(sys.argv) != 2 or \
-            (len(sys.argv) > 1 and \
-                 sys.argv[1][len(sys.argv[1]) - 4::] != '.asm'):
-        print 'Usage: ' + sys.argv[0] + ' [filename].asm'
+    arguments = sys.argv[1:]
+    outputFormat = 'text'
+    if len(arguments) > 1 and arguments[-1] in OUTPUT_FORMATS:
+        outputFormat = arguments.pop()
+    batch = len(arguments) > 1 or (len(arguments) == 1 and
+                                   (os.path.isdir(arguments[0]) or
+                                    glob.has_magic(arguments[0])))
+    if not arguments or \
+            (not batch and arguments[0][len(arguments[0]) - 4::] != '.asm'):
+        print 'Usage: ' + sys.argv[0] + ' [filename].asm [text|hex|le|be]'
+        print '       ' + sys.argv[0] + \
+              ' [directory|pattern]... [text|hex|le|be]'
+        return
+
+    # Assemble every .asm file in the given directories, patterns, and files:
+    if batch:
+        filenames = findAssemblyFiles(arguments)
+        if not filenames:
+            print 'Error: no .asm files found.'
+            return
+        if assembleFiles(filenames, outputFormat):
+            sys.exit(-1)
         return
 
     # Ensure the file exists and is a valid file:
@@ -453,18 +1012,24 @@ def main():
         print 'Error: "' + inputFilename + '" does not exist or is not a file.'
         return
 
-    # Read the input (.asm) file:
+    # Read and assemble the input (.asm) file:
     fin = open(sys.argv[1], 'r')
-    parsedCode = parse(fin)
-    fin.close()
+    try:
+        machineCode = Assembler().assemble(fin)
+    except AssemblyError as error:
+        print 'Error: ' + str(error)
+        print '\t' + error.sourceLineString
+        sys.exit(-1)
+    finally:
+        fin.close()
 
-    # Write binary instruction strings to the output (.hack) file:
-    outputFilename = sys.argv[1][:-len('.asm'):] + '.hack'
-    fout = open(outputFilename, 'w')
-    processSymbols(parsedCode)
-    translatedCode = translate(parsedCode)
-    for line in translatedCode:
-        print >>fout, line
+    # Write the machine code to the output (e.g., .hack) file:
+    outputFilename = getOutputFilename(sys.argv[1], outputFormat)
+    if outputFormat in ('le', 'be'):
+        fout = open(outputFilename, 'wb')
+    else:
+        fout = open(outputFilename, 'w')
+    writeMachineCode(fout, machineCode, outputFormat)
     fout.close()
 
 if __name__ == '__main__':
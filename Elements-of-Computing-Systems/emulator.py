@@ -0,0 +1,520 @@
+#!usr/bin/python2
+
+#-------------------------------------------------------------------------------
+#    Filename: emulator.py
+#
+#      Author: David C. Drake (https://davidcdrake.com)
+#
+# Description: A 'HackComputer' class that emulates the Hack computer specified
+#              in "The Elements of Computing Systems," by Nisan and Schocken
+#              (MIT Press, 2005), running the machine code files ('.hack')
+#              produced by 'assembler.py'. Every instruction is decoded once,
+#              when the program is loaded, so that running it involves no
+#              string processing. Developed using Python 2.7.
+#-------------------------------------------------------------------------------
+
+import sys
+import os.path
+import array
+import timeit
+
+from assembler import COMPUTATIONS, PREDEFINED_SYMBOLS
+
+DEBUG = False
+
+ROM_SIZE = 2 ** 15
+
+RAM_SIZE = 2 ** 15
+
+SCREEN = PREDEFINED_SYMBOLS['SCREEN']
+
+SCREEN_SIZE = 8192
+
+KBD = PREDEFINED_SYMBOLS['KBD']
+
+WORD_MASK = 0xFFFF
+
+ADDRESS_MASK = RAM_SIZE - 1
+
+# Masks for the C-instruction's jump bits, by the sign of the ALU output:
+JUMP_IF_NEGATIVE = 4
+JUMP_IF_ZERO = 2
+JUMP_IF_POSITIVE = 1
+
+# Jump code for an unconditional jump to a preceding A-instruction that loads
+# its own address (e.g., '(END) @END 0;JMP'), by which Hack programs halt:
+HALT = 8
+
+#-------------------------------------------------------------------------------
+#    Function: createComputeFunction
+#
+# Description: Creates a function that performs the computation specified by
+#              the 'a' and 'c' bits of a C-instruction. The computations of the
+#              Hack assembly language (see 'assembler.COMPUTATIONS') become
+#              simple Python expressions; any other combination of bits is
+#              computed by emulating the ALU's 'zx', 'nx', 'zy', 'ny', 'f', and
+#              'no' control bits.
+#
+#      Inputs: bits - A string containing the seven 'a' and 'c' bits.
+#
+#     Outputs: A function taking the values of the A and D registers and the
+#              RAM array, and returning the 16-bit result.
+#-------------------------------------------------------------------------------
+def createComputeFunction(bits):
+    for (computation, computationBits) in COMPUTATIONS.items():
+        if ('M' in computation) == (bits[0] == '1') and \
+           computationBits == bits[1:]:
+            expression = computation.replace('!', '~')
+            expression = expression.replace('M', 'ram[A & ' +
+                                            str(ADDRESS_MASK) + ']')
+            return eval('lambda A, D, ram: (' + expression + ') & ' +
+                        str(WORD_MASK))
+
+    (zx, nx, zy, ny, f, no) = [bit == '1' for bit in bits[1:]]
+    def compute(A, D, ram):
+        x = D
+        if bits[0] == '1':
+            y = ram[A & ADDRESS_MASK]
+        else:
+            y = A
+        if zx:
+            x = 0
+        if nx:
+            x = ~x
+        if zy:
+            y = 0
+        if ny:
+            y = ~y
+        if f:
+            out = x + y
+        else:
+            out = x & y
+        if no:
+            out = ~out
+        return out & WORD_MASK
+
+    return compute
+
+COMPUTE_FUNCTIONS = [createComputeFunction(bin(code)[2:].zfill(7))
+                     for code in range(2 ** 7)]
+
+#-------------------------------------------------------------------------------
+#       Class: HackComputer
+#
+# Description: Emulates the Hack computer: a 32K-word instruction memory (ROM),
+#              a 32K-word data memory (RAM) including the memory-mapped screen
+#              and keyboard, and the A, D, and PC registers. Memories are held
+#              in 16-bit arrays. When a program is loaded, each C-instruction
+#              is decoded into a tuple containing its compute function,
+#              destination bits, and jump bits; A-instructions need no
+#              decoding, since each is simply the value to be loaded into A.
+#-------------------------------------------------------------------------------
+class HackComputer:
+    #--------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Initializes the HackComputer object.
+    #
+    #      Inputs: words - A list of 16-bit machine code instructions (as
+    #                      integers) to be loaded into the ROM. ('None' by
+    #                      default.)
+    #
+    #     Outputs: None.
+    #--------------------------------------------------------------------------
+    def __init__(self, words=None):
+        self.rom = array.array('H')
+        self.decoded = []
+        self.ram = array.array('H', [0]) * RAM_SIZE
+        self.A = 0
+        self.D = 0
+        self.pc = 0
+        self.cycles = 0
+        self.halted = False
+        if words is not None:
+            self.load(words)
+
+    #--------------------------------------------------------------------------
+    #      Method: load
+    #
+    # Description: Loads a program into the ROM, decodes its instructions, and
+    #              resets the computer.
+    #
+    #      Inputs: words - A list (or array) of 16-bit machine code
+    #                      instructions, as integers.
+    #
+    #     Outputs: None. (Raises a ValueError if the program is too long or an
+    #              instruction is not a 16-bit word.)
+    #--------------------------------------------------------------------------
+    def load(self, words):
+        if len(words) > ROM_SIZE:
+            raise ValueError('program exceeds ' + str(ROM_SIZE) + ' words')
+        if not isinstance(words, array.array) or words.typecode != 'H':
+            for word in words:
+                if not 0 <= word <= WORD_MASK:
+                    raise ValueError('invalid instruction: ' + repr(word))
+
+        # The ROM is a copy, so it cannot change without being decoded again:
+        self.rom = array.array('H', words)
+        self.decoded = [self.decode(address)
+                        for address in range(len(self.rom))]
+        self.reset()
+
+    #--------------------------------------------------------------------------
+    #      Method: loadHack
+    #
+    # Description: Loads a program from a Hack machine code file, which
+    #              contains one instruction per line as a string of sixteen
+    #              '0' and '1' characters (as written by 'assembler.py').
+    #
+    #      Inputs: fin - An open file handle containing machine code.
+    #
+    #     Outputs: None. (Raises a ValueError, naming the offending line, if
+    #              the file contains an invalid instruction.)
+    #--------------------------------------------------------------------------
+    def loadHack(self, fin):
+        words = []
+        lineNum = 0
+        for line in fin:
+            lineNum += 1
+            line = line.strip()
+            if not line:
+                continue
+            if len(line) != 16 or line.strip('01'):
+                raise ValueError('invalid instruction on line ' +
+                                 str(lineNum) + ': ' + line)
+            words.append(int(line, 2))
+
+        self.load(words)
+
+    #--------------------------------------------------------------------------
+    #      Method: loadHex
+    #
+    # Description: Loads a program from a file containing one instruction per
+    #              line as four hexadecimal digits (as written by
+    #              'assembler.py' in its 'hex' format).
+    #
+    #      Inputs: fin - An open file handle containing machine code.
+    #
+    #     Outputs: None. (Raises a ValueError, naming the offending line, if
+    #              the file contains an invalid instruction.)
+    #--------------------------------------------------------------------------
+    def loadHex(self, fin):
+        words = []
+        lineNum = 0
+        for line in fin:
+            lineNum += 1
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                if len(line) != 4:
+                    raise ValueError
+                words.append(int(line, 16))
+            except ValueError:
+                raise ValueError('invalid instruction on line ' +
+                                 str(lineNum) + ': ' + line)
+
+        self.load(words)
+
+    #--------------------------------------------------------------------------
+    #      Method: loadImage
+    #
+    # Description: Loads a program from a raw ROM image: two bytes per
+    #              instruction (as written by 'assembler.py' in its 'le' and
+    #              'be' formats). The image is read directly into an array,
+    #              without parsing each instruction.
+    #
+    #      Inputs: fin       - An open file handle (in binary mode) containing
+    #                          a ROM image.
+    #              bigEndian - If 'True', the most significant byte of each
+    #                          instruction comes first. ('False' by default.)
+    #
+    #     Outputs: None. (Raises a ValueError if the image has an odd number
+    #              of bytes.)
+    #--------------------------------------------------------------------------
+    def loadImage(self, fin, bigEndian=False):
+        image = fin.read()
+        if len(image) % 2:
+            raise ValueError('ROM image has an odd number of bytes')
+        words = array.array('H')
+        words.fromstring(image)
+        if bigEndian != (sys.byteorder == 'big'):
+            words.byteswap()
+
+        self.load(words)
+
+    #--------------------------------------------------------------------------
+    #      Method: decode
+    #
+    # Description: Decodes the instruction at a given ROM address.
+    #
+    #      Inputs: address - The instruction's ROM address.
+    #
+    #     Outputs: 'None' for an A-instruction; otherwise, a tuple containing
+    #              the instruction's compute function, its destination bits
+    #              (A = 4, D = 2, M = 1), and its jump bits (or HALT).
+    #--------------------------------------------------------------------------
+    def decode(self, address):
+        word = self.rom[address]
+        if word < 0x8000:
+            return None
+
+        compute = COMPUTE_FUNCTIONS[(word >> 6) & 0x7F]
+        destination = (word >> 3) & 0x7
+        jump = word & 0x7
+        if jump == 0x7 and address > 0 and \
+           self.rom[address - 1] == address - 1 and not destination:
+            jump = HALT
+
+        return (compute, destination, jump)
+
+    #--------------------------------------------------------------------------
+    #      Method: reset
+    #
+    # Description: Resets the computer: the registers and cycle count are set
+    #              to zero and, optionally, the RAM is cleared.
+    #
+    #      Inputs: clearMemory - If 'True', every RAM word is set to zero.
+    #                            ('True' by default.)
+    #
+    #     Outputs: None.
+    #--------------------------------------------------------------------------
+    def reset(self, clearMemory=True):
+        if clearMemory:
+            self.ram = array.array('H', [0]) * RAM_SIZE
+        self.A = 0
+        self.D = 0
+        self.pc = 0
+        self.cycles = 0
+        self.halted = False
+
+    #--------------------------------------------------------------------------
+    #      Method: run
+    #
+    # Description: Executes instructions until the program halts (by jumping
+    #              into the conventional '(END) @END 0;JMP' loop, or by running
+    #              past the end of the ROM) or a given number of instructions
+    #              have been executed.
+    #
+    #      Inputs: maxSteps - Maximum number of instructions to execute, or
+    #                         'None' for no limit. ('None' by default.)
+    #
+    #     Outputs: The number of instructions executed.
+    #--------------------------------------------------------------------------
+    def run(self, maxSteps=None):
+        rom = self.rom
+        decoded = self.decoded
+        ram = self.ram
+        size = len(rom)
+        A = self.A
+        D = self.D
+        pc = self.pc
+        steps = 0
+        if maxSteps is None:
+            maxSteps = sys.maxint
+
+        while steps < maxSteps and not self.halted:
+            if pc >= size:
+                self.halted = True
+                break
+            steps += 1
+            word = rom[pc]
+
+            # A-instructions:
+            if word < 0x8000:
+                A = word
+                pc += 1
+                continue
+
+            # C-instructions:
+            (compute, destination, jump) = decoded[pc]
+            out = compute(A, D, ram)
+            address = A
+            if destination:
+                if destination & 1:
+                    ram[address & ADDRESS_MASK] = out
+                if destination & 2:
+                    D = out
+                if destination & 4:
+                    A = out
+            if not jump:
+                pc += 1
+            elif jump == HALT:
+                pc = address
+                self.halted = True
+            elif out == 0:
+                if jump & JUMP_IF_ZERO:
+                    pc = address
+                else:
+                    pc += 1
+            elif out & 0x8000:
+                if jump & JUMP_IF_NEGATIVE:
+                    pc = address
+                else:
+                    pc += 1
+            elif jump & JUMP_IF_POSITIVE:
+                pc = address
+            else:
+                pc += 1
+
+        self.A = A
+        self.D = D
+        self.pc = pc
+        self.cycles += steps
+
+        return steps
+
+    #--------------------------------------------------------------------------
+    #      Method: step
+    #
+    # Description: Executes a single instruction (unless the program has
+    #              halted).
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The number of instructions executed (one or zero).
+    #--------------------------------------------------------------------------
+    def step(self):
+        return self.run(1)
+
+    #--------------------------------------------------------------------------
+    #      Method: getRam
+    #
+    # Description: Takes a snapshot of a range of the RAM.
+    #
+    #      Inputs: address - Address of the first word (zero by default).
+    #              count   - Number of words (RAM_SIZE minus 'address' by
+    #                        default).
+    #
+    #     Outputs: A copy of the requested words, as an array of unsigned
+    #              16-bit integers.
+    #--------------------------------------------------------------------------
+    def getRam(self, address=0, count=None):
+        if count is None:
+            count = RAM_SIZE - address
+        return self.ram[address:address + count]
+
+    #--------------------------------------------------------------------------
+    #      Method: getScreen
+    #
+    # Description: Takes a snapshot of the screen memory map: 256 rows of 32
+    #              words, each bit of which is a pixel (1 = black), with the
+    #              least significant bit leftmost.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: A copy of the screen's 8192 words, as an array of unsigned
+    #              16-bit integers.
+    #--------------------------------------------------------------------------
+    def getScreen(self):
+        return self.getRam(SCREEN, SCREEN_SIZE)
+
+    #--------------------------------------------------------------------------
+    #      Method: getKeyboard
+    #
+    # Description: Reads the keyboard memory map.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: The code of the key currently held down (zero if none).
+    #--------------------------------------------------------------------------
+    def getKeyboard(self):
+        return self.ram[KBD]
+
+    #--------------------------------------------------------------------------
+    #      Method: setKeyboard
+    #
+    # Description: Simulates holding down a key (or releasing all keys).
+    #
+    #      Inputs: keyCode - The key's Hack character code, or zero for none.
+    #
+    #     Outputs: None.
+    #--------------------------------------------------------------------------
+    def setKeyboard(self, keyCode):
+        self.ram[KBD] = keyCode
+
+    #--------------------------------------------------------------------------
+    #      Method: snapshot
+    #
+    # Description: Takes a snapshot of the computer's entire state.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: A dictionary containing the 'A', 'D', and 'pc' registers,
+    #              the number of 'cycles' executed, whether the program has
+    #              'halted', and a copy of the 'ram'.
+    #--------------------------------------------------------------------------
+    def snapshot(self):
+        return {'A':      self.A,
+                'D':      self.D,
+                'pc':     self.pc,
+                'cycles': self.cycles,
+                'halted': self.halted,
+                'ram':    self.getRam()}
+
+#-------------------------------------------------------------------------------
+#    Function: main
+#
+# Description: Processes command line arguments (printing usage information and
+#              exiting if any associated error is detected), then runs a Hack
+#              machine code file until it halts or reaches an optional step
+#              limit, and reports the number of cycles executed, the emulation
+#              speed, and the contents of registers R0 through R15.
+#
+#      Inputs: An input file with a '.hack', '.hex', '.bin' (little-endian
+#              ROM image), or '.be.bin' (big-endian ROM image) extension must
+#              be specified as a command-line argument, optionally followed by
+#              a step limit.
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def main():
+    # Check for correct number and type of arguments:
+    extension = ''
+    if len(sys.argv) in (2, 3):
+        extension = os.path.splitext(sys.argv[1])[1]
+    if extension not in ('.hack', '.hex', '.bin') or \
+       (len(sys.argv) == 3 and not sys.argv[2].isdigit()):
+        print 'Usage: ' + sys.argv[0] + \
+              ' [filename].hack|.hex|.bin|.be.bin [max steps]'
+        return
+
+    # Ensure the file exists and is a valid file:
+    inputFilename = sys.argv[1]
+    if not os.path.isfile(inputFilename):
+        print 'Error: "' + inputFilename + '" does not exist or is not a file.'
+        return
+    maxSteps = None
+    if len(sys.argv) == 3:
+        maxSteps = int(sys.argv[2])
+
+    # Load and run the program:
+    computer = HackComputer()
+    fin = open(inputFilename, 'rb')
+    try:
+        if extension == '.hack':
+            computer.loadHack(fin)
+        elif extension == '.hex':
+            computer.loadHex(fin)
+        else:
+            computer.loadImage(fin, inputFilename.endswith('.be.bin'))
+    except ValueError as error:
+        print 'Error: ' + str(error)
+        return
+    finally:
+        fin.close()
+    startTime = timeit.default_timer()
+    computer.run(maxSteps)
+    elapsedTime = timeit.default_timer() - startTime
+
+    if computer.halted:
+        print 'Halted after', computer.cycles, 'cycles',
+    else:
+        print 'Stopped after', computer.cycles, 'cycles',
+    print '(%.3f seconds, %.0f cycles per second).' % \
+          (elapsedTime, computer.cycles / max(elapsedTime, 1e-9))
+    for register in range(16):
+        print 'R' + str(register) + ':', computer.ram[register]
+
+if __name__ == '__main__':
+    main()
@@ -6,20 +6,176 @@
 #      Author: David C. Drake (https://davidcdrake.com)
 #
 # Description: A collection of sort functions -- bubble sort, shaker sort,
-#              selection sort, quick sort, modified quick sort, merge sort, and
-#              hash sort -- as well as helper functions to analyze the
-#              effectiveness and efficiency of those functions. Developed using
-#              Python 2.7.
+#              selection sort, quick sort, three-way quick sort, modified quick
+#              sort, merge sort, bottom-up merge sort, TimSort-style natural
+#              merge sort, hash sort, counting sort, radix sort, introspective
+#              sort, bottom-up heap sort, Shell sort, external merge sort, and
+#              parallel sample sort -- as well as helper functions to analyze
+#              the effectiveness and efficiency of those functions (including
+#              per-phase tracing, via 'SortTracer') and a SortedList container
+#              that stays sorted under insertions and removals. Run with the
+#              'sort' argument, it is also a streaming, 'sort'-like command-line
+#              tool (see 'sortCommand'). The sort functions accept lists, typed
+#              arrays ('array.array'), or writable memoryviews of byte buffers,
+#              and sort them in place. Developed using Python 2.7.
 #-------------------------------------------------------------------------------
 
 import sys
 import random
 import math
+import gc
+import time
+import timeit
+import json
+import csv
+import hashlib
+import multiprocessing
+import os
+import io
+import tempfile
+import shutil
+import heapq
+import itertools
+import operator
+import bisect
+import array
+import subprocess
+import platform
+import ast
+import inspect
+import textwrap
+import argparse
+import errno
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INSERTION_SORT_CUTOFF = 16
+
+NINTHER_CUTOFF = 40
+
+MIN_GALLOP = 7
+
+COUNTING_SORT_RANGE_FACTOR = 4
+
+RADIX_BITS = 8
+
+RADIX = 2 ** RADIX_BITS
+
+INTEGER_SORT_FUNCTION_NAMES = ['countingSort', 'radixSort', 'integerSort']
+
+EXTERNAL_SORT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+EXTERNAL_SORT_FAN_IN = 16
+
+POINTER_SIZE = 8
+
+WRITE_BATCH_SIZE = 4096
+
+OUTPUT_BUFFER_SIZE = 2 ** 20
+
+VECTORIZE_THRESHOLD = 256
+
+PARALLEL_SORT_THRESHOLD = 2 ** 16
+
+SAMPLE_SORT_OVERSAMPLING = 64
+
+C_LONG_MAX = 2 ** (8 * array.array('l').itemsize - 1) - 1
+
+C_LONG_MIN = -C_LONG_MAX - 1
+
+TYPED_ARRAY_TYPECODE = 'l'
+
+SORTED_LIST_CHUNK_SIZE = 1000
+
+CIURA_GAPS = [1, 4, 10, 23, 57, 132, 301, 701, 1750]
+
+# Each gap sequence maps (k, gap k) to gap k + 1, where gap 1 is always 1:
+SHELL_SORT_GAP_SEQUENCES = {
+    'ciura':     lambda k, gap: (CIURA_GAPS[k] if k < len(CIURA_GAPS)
+                                 else int(gap * 2.25)),
+    'tokuda':    lambda k, gap: -(-(9 ** (k + 1) - 4 ** (k + 1)) //
+                                  (5 * 4 ** k)),
+    'sedgewick': lambda k, gap: 4 ** k + 3 * 2 ** (k - 1) + 1}
+
+FEW_UNIQUE_VALUES = 8
+
+SAWTOOTH_TEETH = 8
+
+ZIPF_EXPONENT = 1.2
+
+K_SORTED_DISTANCE = 8
+
+SCALING_MODELS = [('n',       lambda n: n),
+                  ('n log n', lambda n: n * math.log(n, 2)),
+                  ('n^2',     lambda n: n ** 2)]
+
+DISTRIBUTIONS = {}
+
+BENCHMARK_METRICS = ['wallTime', 'cpuTime', 'peakMemory', 'comparisons',
+                     'swaps']
+
+BENCHMARK_CSV_COLUMNS = ['function', 'distribution', 'container', 'size',
+                         'repetitions', 'warmups',
+                         'medianWallTime', 'p95WallTime',
+                         'medianCpuTime', 'p95CpuTime',
+                         'medianPeakMemory', 'p95PeakMemory',
+                         'medianComparisons', 'p95Comparisons',
+                         'medianSwaps', 'p95Swaps']
+
+BENCHMARK_HISTORY_FILE = 'benchmark_history.jsonl'
+
+REGRESSION_SIGNIFICANCE = 0.01
+
+REGRESSION_THRESHOLD = 1.05
+
+UNINSTRUMENTED_COUNTERS = ['comparisons', 'swaps', 'totalComparisons',
+                           'totalSwaps']
+
+# Functions whose counts drive control flow (the swap counts returned by these
+# passes tell 'bubbleSort' and 'shakerSort' when to stop), so they cannot run
+# uninstrumented:
+INSTRUMENTED_FUNCTIONS = ['bubbleSortPass', 'shakerSortPass']
+
+UNINSTRUMENTED_FUNCTIONS = {}
+
+# The helper functions recorded by 'SortTracer', and the phases they represent:
+TRACE_PHASES = {'quickSortOverRange':           'recursion',
+                'threeWayQuickSortOverRange':   'recursion',
+                'partialSortOverRange':         'recursion',
+                'quickSelectOverRange':         'recursion',
+                'mergeSort':                    'recursion',
+                'quickSortPartitionOverRange':  'partition',
+                'threeWayPartitionOverRange':   'partition',
+                'partitionOverRange':           'partition',
+                'medianOfMedians':              'partition',
+                'mergeHalves':                  'merge',
+                'mergeRunsAt':                  'merge',
+                'mergeParallelBucket':          'merge',
+                'mergeSortedRuns':              'merge',
+                'bubbleSortPass':               'pass',
+                'shakerSortPass':               'pass',
+                'countRunAndMakeAscending':     'run',
+                'insertionSortOverRange':       'insertion',
+                'binaryInsertionSortOverRange': 'insertion',
+                'heapSortOverRange':            'heap',
+                'createScratchBuffer':          'copy',
+                'copySlice':                    'copy',
+                'assignContents':               'copy',
+                'writeSortedRun':               'spill'}
 
 #-------------------------------------------------------------------------------
 #    Function: bubbleSort
 #
-# Description: Sorts a list using a "bubble sort" algorithm.
+# Description: Sorts a list using a "bubble sort" algorithm. The sort is
+#              stable.
 #
 #      Inputs: list - The list to be sorted.
 #
@@ -60,10 +216,40 @@ def bubbleSortPass(list):
 
     return (comparisons, swaps)
 
+#-------------------------------------------------------------------------------
+#    Function: optimizedBubbleSort
+#
+# Description: Sorts a list using a "bubble sort" algorithm, like 'bubbleSort',
+#              but with each pass done inline and ending at the position of the
+#              previous pass's last swap, beyond which the list is already
+#              sorted. The sort is stable.
+#
+#      Inputs: list - The list to be sorted.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def optimizedBubbleSort(list):
+    comparisons, swaps = 0, 0
+
+    end = len(list) - 1
+    while end > 0:
+        lastSwap = 0
+        for i in xrange(end):
+            comparisons += 1
+            if list[i] > list[i + 1]:
+                list[i], list[i + 1] = list[i + 1], list[i]
+                swaps += 1
+                lastSwap = i
+        end = lastSwap
+
+    return (comparisons, swaps)
+
 #-------------------------------------------------------------------------------
 #    Function: shakerSort
 #
-# Description: Sorts a list using a "shaker sort" algorithm.
+# Description: Sorts a list using a "shaker sort" algorithm. The sort is
+#              stable.
 #
 #      Inputs: list - The list to be sorted.
 #
@@ -109,10 +295,47 @@ def shakerSortPass(list):
 
     return (comparisons, swaps)
 
+#-------------------------------------------------------------------------------
+#    Function: optimizedShakerSort
+#
+# Description: Sorts a list using a "shaker sort" algorithm, like 'shakerSort',
+#              but with each pass done inline and confined to the range between
+#              the last swaps of the previous forward and backward passes,
+#              outside of which the list is already sorted. The sort is stable.
+#
+#      Inputs: list - The list to be sorted.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def optimizedShakerSort(list):
+    comparisons, swaps = 0, 0
+
+    low, high = 0, len(list) - 1
+    while low < high:
+        lastSwap = low
+        for i in xrange(low, high):
+            comparisons += 1
+            if list[i] > list[i + 1]:
+                list[i], list[i + 1] = list[i + 1], list[i]
+                swaps += 1
+                lastSwap = i
+        high = lastSwap
+        for i in xrange(high, low, -1):
+            comparisons += 1
+            if list[i] < list[i - 1]:
+                list[i], list[i - 1] = list[i - 1], list[i]
+                swaps += 1
+                lastSwap = i
+        low = lastSwap
+
+    return (comparisons, swaps)
+
 #-------------------------------------------------------------------------------
 #    Function: selectionSort
 #
 # Description: Sorts the elements of a list via the "selection sort" strategy.
+#              The sort is not stable.
 #
 #      Inputs: list - The list to be sorted.
 #
@@ -137,7 +360,8 @@ def selectionSort(list):
 #-------------------------------------------------------------------------------
 #    Function: quickSort
 #
-# Description: Sorts the elements of a list via the "quick sort" strategy.
+# Description: Sorts the elements of a list via the "quick sort" strategy. The
+#              sort is not stable.
 #
 #      Inputs: list - The list to be sorted.
 #
@@ -166,6 +390,37 @@ def quickSortOverRange(list, low, high):
     if high <= low:
         return (comparisons, swaps)
 
+    (pivotIndex, comparisons, swaps) = \
+        quickSortPartitionOverRange(list, low, high)
+
+    # Split list/sub-list at pivot point and sort each half:
+    (c, s) = quickSortOverRange(list, low, pivotIndex - 1)
+    comparisons += c
+    swaps += s
+    (c, s) = quickSortOverRange(list, pivotIndex + 1, high)
+    comparisons += c
+    swaps += s
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: quickSortPartitionOverRange
+#
+# Description: Partitions a given range of a list around its first element, as
+#              'quickSortOverRange' does: afterward, every element before the
+#              pivot is less than it and no element after it is.
+#
+#      Inputs: list - The list to be partitioned.
+#              low  - Lower bound of the range; also the pivot.
+#              high - Upper bound of the range.
+#
+#     Outputs: A tuple containing the pivot's final index, the number of
+#              element comparisons, and the number of element swaps that
+#              occurred.
+#-------------------------------------------------------------------------------
+def quickSortPartitionOverRange(list, low, high):
+    comparisons, swaps = 0, 0
+
     # Divide list/sub-list by comparison of each element to first element:
     leftMostGreaterThan = low + 1
     for i in range(low + 1, high + 1):
@@ -183,21 +438,335 @@ def quickSortOverRange(list, low, high):
                    list[leftMostGreaterThan - 1], list[low]
         swaps += 1
 
-    # Split list/sub-list at pivot point and sort each half:
-    (c, s) = quickSortOverRange(list, low, leftMostGreaterThan - 2)
+    return (leftMostGreaterThan - 1, comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: threeWayQuickSort
+#
+# Description: Sorts the elements of a list via the "three-way quick sort"
+#              strategy, which groups all elements equal to the pivot together
+#              in a single pass (Dijkstra's "Dutch national flag" partitioning)
+#              so they are never compared again. Lists with few distinct values
+#              are sorted in close to linear time. The sort is not stable.
+#
+#      Inputs: list - The list to be sorted.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def threeWayQuickSort(list):
+    return threeWayQuickSortOverRange(list, 0, len(list) - 1)
+
+#-------------------------------------------------------------------------------
+#    Function: threeWayQuickSortOverRange
+#
+# Description: Sorts a given range of a list via the "three-way quick sort"
+#              strategy. Pivots are chosen via 'choosePivot', and only the
+#              smaller of the "less than" and "greater than" partitions is
+#              sorted recursively (the larger one is handled by the next loop
+#              iteration), so recursion depth never exceeds log2(n).
+#
+#      Inputs: list - The list to be sorted.
+#              low  - Lower bound of the range.
+#              high - Upper bound of the range.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def threeWayQuickSortOverRange(list, low, high):
+    comparisons, swaps = 0, 0
+
+    while high > low:
+        # Move the chosen pivot to the front of the range:
+        (pivotIndex, c) = choosePivot(list, low, high)
+        comparisons += c
+        if pivotIndex != low:
+            list[low], list[pivotIndex] = list[pivotIndex], list[low]
+            swaps += 1
+
+        (lessThanEnd, greaterThanStart, c, s) = \
+            threeWayPartitionOverRange(list, low, high)
+        comparisons += c
+        swaps += s
+
+        # Recursively sort the smaller partition and loop on the larger one:
+        if lessThanEnd - low < high - greaterThanStart:
+            (c, s) = threeWayQuickSortOverRange(list, low, lessThanEnd - 1)
+            low = greaterThanStart + 1
+        else:
+            (c, s) = threeWayQuickSortOverRange(list, greaterThanStart + 1,
+                                                high)
+            high = lessThanEnd - 1
+        comparisons += c
+        swaps += s
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: threeWayPartitionOverRange
+#
+# Description: Partitions a given range of a list around its first element into
+#              three groups: elements less than, equal to, and greater than the
+#              pivot (Dijkstra's "Dutch national flag" scheme).
+#
+#      Inputs: list - The list to be partitioned.
+#              low  - Lower bound of the range; also the pivot.
+#              high - Upper bound of the range.
+#
+#     Outputs: A tuple containing the index of the first and last elements equal
+#              to the pivot, the number of element comparisons, and the number
+#              of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def threeWayPartitionOverRange(list, low, high):
+    comparisons, swaps = 0, 0
+
+    pivot = list[low]
+    lessThanEnd = low
+    greaterThanStart = high
+    i = low + 1
+    while i <= greaterThanStart:
+        comparisons += 1
+        if list[i] < pivot:
+            list[lessThanEnd], list[i] = list[i], list[lessThanEnd]
+            swaps += 1
+            lessThanEnd += 1
+            i += 1
+            continue
+        comparisons += 1
+        if pivot < list[i]:
+            list[i], list[greaterThanStart] = list[greaterThanStart], list[i]
+            swaps += 1
+            greaterThanStart -= 1
+        else:
+            i += 1
+
+    return (lessThanEnd, greaterThanStart, comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: partialSort
+#
+# Description: Partially sorts a list so that its first 'k' elements are its
+#              'k' smallest, in ascending order (the order of the remaining
+#              elements is unspecified). Uses the same partitioning scheme as
+#              'quickSort', but only recurses into partitions that overlap the
+#              first 'k' positions.
+#
+#      Inputs: list - The list to be partially sorted.
+#              k    - The number of smallest elements to be sorted.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def partialSort(list, k):
+    return partialSortOverRange(list, 0, len(list) - 1, k)
+
+#-------------------------------------------------------------------------------
+#    Function: partialSortOverRange
+#
+# Description: Partially sorts a given range of a list so that the elements that
+#              belong before index 'k' are in their final, sorted positions.
+#
+#      Inputs: list - The list to be partially sorted.
+#              low  - Lower bound of the range.
+#              high - Upper bound of the range.
+#              k    - Index of the first position that need not be sorted.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def partialSortOverRange(list, low, high, k):
+    comparisons, swaps = 0, 0
+
+    if high <= low or k <= low:
+        return (comparisons, swaps)
+
+    (pivotIndex, comparisons, swaps) = \
+        quickSortPartitionOverRange(list, low, high)
+
+    # Sort the lower partition, and the upper one only if it's needed:
+    (c, s) = partialSortOverRange(list, low, pivotIndex - 1, k)
     comparisons += c
     swaps += s
-    (c, s) = quickSortOverRange(list, leftMostGreaterThan, high)
+    if pivotIndex + 1 < k:
+        (c, s) = partialSortOverRange(list, pivotIndex + 1, high, k)
+        comparisons += c
+        swaps += s
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: quickSelect
+#
+# Description: Finds the element that would be at a given index if a list were
+#              sorted (e.g., the median, if 'k' is half the list's length) via
+#              the "quickselect" strategy, partially reordering the list so that
+#              that element is at index 'k', with no greater elements before it
+#              and no smaller elements after it. Pivots are chosen via
+#              'choosePivot' until the partitioning depth exceeds 2 * log2(n),
+#              after which the "median of medians" is used, guaranteeing linear
+#              time in the worst case.
+#
+#      Inputs: list - The list to be searched.
+#              k    - The index (in sorted order) of the desired element.
+#
+#     Outputs: A tuple containing the element, the number of element
+#              comparisons, and the number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def quickSelect(list, k):
+    if not 0 <= k < len(list):
+        raise IndexError('quickSelect index out of range')
+
+    return quickSelectOverRange(list, 0, len(list) - 1, k)
+
+#-------------------------------------------------------------------------------
+#    Function: quickSelectOverRange
+#
+# Description: Finds the element that belongs at a given index within a range
+#              of a list via the "quickselect" strategy (see 'quickSelect').
+#
+#      Inputs: list         - The list to be searched.
+#              low          - Lower bound of the range.
+#              high         - Upper bound of the range.
+#              k            - The index of the desired element, within the
+#                             range.
+#              alwaysLinear - If 'True', the median of medians is always used
+#                             as the pivot. ('False' by default.)
+#
+#     Outputs: A tuple containing the element, the number of element
+#              comparisons, and the number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def quickSelectOverRange(list, low, high, k, alwaysLinear=False):
+    comparisons, swaps = 0, 0
+
+    if alwaysLinear:
+        maxDepth = 0
+    else:
+        maxDepth = 2 * int(math.log(high - low + 1, 2))
+    depth = 0
+    while high > low:
+        if depth >= maxDepth:
+            (pivotIndex, c, s) = medianOfMedians(list, low, high)
+            swaps += s
+        else:
+            (pivotIndex, c) = choosePivot(list, low, high)
+        comparisons += c
+        depth += 1
+
+        # Move the chosen pivot to the front of the range:
+        if pivotIndex != low:
+            list[low], list[pivotIndex] = list[pivotIndex], list[low]
+            swaps += 1
+
+        (pivotIndex, c, s) = partitionOverRange(list, low, high)
+        comparisons += c
+        swaps += s
+        if k < pivotIndex:
+            high = pivotIndex - 1
+        elif k > pivotIndex:
+            low = pivotIndex + 1
+        else:
+            break
+
+    return (list[k], comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: medianOfMedians
+#
+# Description: Finds an approximate median of a range of a list that is
+#              guaranteed to be greater than at least 30% of the range and less
+#              than at least 30% of it: the range is divided into groups of
+#              five, each group is sorted, the groups' medians are moved to the
+#              front of the range, and their median is found via
+#              'quickSelectOverRange' (recursively using this method).
+#
+#      Inputs: list - The list containing the range.
+#              low  - Lower bound of the range.
+#              high - Upper bound of the range.
+#
+#     Outputs: A tuple containing the index of the approximate median, the
+#              number of element comparisons, and the number of element swaps
+#              that occurred.
+#-------------------------------------------------------------------------------
+def medianOfMedians(list, low, high):
+    comparisons, swaps = 0, 0
+
+    mediansEnd = low
+    for groupLow in range(low, high + 1, 5):
+        groupHigh = min(groupLow + 4, high)
+        (c, s) = insertionSortOverRange(list, groupLow, groupHigh)
+        comparisons += c
+        swaps += s
+        groupMedian = (groupLow + groupHigh) / 2
+        if groupMedian != mediansEnd:
+            list[mediansEnd], list[groupMedian] = \
+                              list[groupMedian], list[mediansEnd]
+            swaps += 1
+        mediansEnd += 1
+
+    middle = (low + mediansEnd - 1) / 2
+    (median, c, s) = quickSelectOverRange(list, low, mediansEnd - 1, middle,
+                                          True)
     comparisons += c
     swaps += s
 
-    return (comparisons, swaps)
+    return (middle, comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: streamingTopK
+#
+# Description: Finds the 'k' smallest elements produced by an iterable (such as
+#              a generator or an open file) in a single pass, keeping only 'k'
+#              elements in memory at a time: a max heap of the smallest
+#              elements seen so far, whose root is replaced whenever a smaller
+#              element arrives.
+#
+#      Inputs: iterable - The source of the elements.
+#              k        - The number of smallest elements to be found.
+#
+#     Outputs: A tuple containing a sorted list of the (up to) 'k' smallest
+#              elements, the number of element comparisons, and the number of
+#              element swaps that occurred.
+#-------------------------------------------------------------------------------
+def streamingTopK(iterable, k):
+    comparisons, swaps = 0, 0
+
+    heap = []
+    if k < 1:
+        return (heap, comparisons, swaps)
+
+    iterator = iter(iterable)
+    for element in itertools.islice(iterator, k):
+        heap.append(element)
+    for root in range(len(heap) / 2 - 1, -1, -1):
+        (c, s) = siftDown(heap, 0, root, len(heap))
+        comparisons += c
+        swaps += s
+
+    for element in iterator:
+        comparisons += 1
+        if element < heap[0]:
+            heap[0] = element
+            swaps += 1
+            (c, s) = siftDown(heap, 0, 0, k)
+            comparisons += c
+            swaps += s
+
+    # Sort the heap in place (it is already a max heap, so no need to rebuild):
+    for end in range(len(heap) - 1, 0, -1):
+        heap[0], heap[end] = heap[end], heap[0]
+        swaps += 1
+        (c, s) = siftDown(heap, 0, 0, end)
+        comparisons += c
+        swaps += s
+
+    return (heap, comparisons, swaps)
 
 #-------------------------------------------------------------------------------
 #    Function: modifiedQuickSort
 #
 # Description: Sorts the elements of a list via the "modified quick sort"
-#              strategy (the first and middles elements are swapped).
+#              strategy (the first and middles elements are swapped). The sort
+#              is not stable.
 #
 #      Inputs: list - The list to be sorted.
 #
@@ -216,7 +785,8 @@ def modifiedQuickSort(list):
 #    Function: mergeSort
 #
 # Description: Sorts a list, or a range within a list, via the "merge sort"
-#              strategy.
+#              strategy. The sort is not stable (when merging, ties are taken
+#              from the second half).
 #
 #      Inputs: list - The list to be sorted.
 #              low  - Lower bound of the range to be sorted, inclusive (zero by
@@ -252,12 +822,38 @@ def mergeSort(list, low=0, high=-1):
     totalComparisons += comparisons
     totalSwaps += swaps
 
+    # Merge the two sorted halves:
+    (comparisons, swaps) = mergeHalves(list, low, mid, high)
+    totalComparisons += comparisons
+    totalSwaps += swaps
+
+    return (totalComparisons, totalSwaps)
+
+#-------------------------------------------------------------------------------
+#    Function: mergeHalves
+#
+# Description: Merges two adjacent sorted ranges of a list for 'mergeSort', via
+#              a new list that is then copied back over both ranges.
+#
+#      Inputs: list - The list containing the ranges.
+#              low  - Lower bound of the first range.
+#              mid  - Upper bound of the first range (the second range begins
+#                     just after it).
+#              high - Upper bound of the second range.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps (i.e., the number of elements copied
+#              back) that occurred.
+#-------------------------------------------------------------------------------
+def mergeHalves(list, low, mid, high):
+    comparisons, swaps = 0, 0
+
     # Merge the two sorted halves in a new list:
     tempList = []
     i = low
     j = mid + 1
     while i <= mid and j <= high:
-        totalComparisons += 1
+        comparisons += 1
         if list[i] < list[j]:
             tempList.append(list[i])
             i += 1
@@ -274,60 +870,1988 @@ def mergeSort(list, low=0, high=-1):
     # Replace the original list/sub-list with the sorted list/sub-list:
     for i in range(len(tempList)):
         list[i + low] = tempList[i]
-        totalSwaps += 1
+        swaps += 1
 
-    return (totalComparisons, totalSwaps)
+    return (comparisons, swaps)
 
 #-------------------------------------------------------------------------------
-#    Function: hashSort
+#    Function: bottomUpMergeSort
 #
-# Description: Sorts a list via the "hash sort" strategy. Assumes that each
-#              value in the list will be less than the length of the list.
+# Description: Sorts a list via a non-recursive, "bottom-up" merge sort: runs of
+#              width 1, 2, 4, etc. are merged pairwise until a single run
+#              remains. A single auxiliary buffer is allocated up front, and
+#              each pass merges from one buffer into the other (alternating
+#              between the list and the buffer) rather than copying back. When
+#              two adjacent runs are already in order, they are copied without
+#              merging. The sort is stable.
 #
 #      Inputs: list - The list to be sorted.
 #
 #     Outputs: A tuple containing the number of element comparisons and the
-#              number of element swaps that occurred.
+#              number of element swaps (i.e., element moves) that occurred.
 #-------------------------------------------------------------------------------
-def hashSort(list):
+def bottomUpMergeSort(list):
     comparisons, swaps = 0, 0
+    n = len(list)
 
-    hashTable = [0] * len(list)
-    for value in list:
-        hashTable[value] += 1
+    source = list
+    destination = createScratchBuffer(list, n)
+    width = 1
+    while width < n:
+        for low in range(0, n, 2 * width):
+            mid = min(low + width, n)
+            high = min(low + 2 * width, n)
 
-    j = 0
-    for i in range(len(list)):
-        while hashTable[j] < 1:
-            j += 1
-            comparisons += 1
-        comparisons += 1
-        if list[i] != j:
-            list[i] = j
-            swaps += 1
-        hashTable[j] -= 1
+            # Copy runs that are already in order (or lack a partner):
+            if mid < high:
+                comparisons += 1
+            if mid == high or not source[mid] < source[mid - 1]:
+                destination[low:high] = source[low:high]
+                swaps += high - low
+                continue
+
+            # Merge the two runs:
+            i, j = low, mid
+            for k in range(low, high):
+                if i >= mid:
+                    takeFromFirstRun = False
+                elif j >= high:
+                    takeFromFirstRun = True
+                else:
+                    comparisons += 1
+                    takeFromFirstRun = not source[j] < source[i]
+                if takeFromFirstRun:
+                    destination[k] = source[i]
+                    i += 1
+                else:
+                    destination[k] = source[j]
+                    j += 1
+            swaps += high - low
+        source, destination = destination, source
+        width *= 2
+
+    # If the last pass merged into the buffer, copy the result back:
+    if source is not list:
+        list[:] = source
+        swaps += n
 
     return (comparisons, swaps)
 
 #-------------------------------------------------------------------------------
-#    Function: createRandomList
+#    Function: timSort
 #
-# Description: Creates a list of a given length whose elements are integers
-#              randomly selected between 0 and the length of the list
-#              (exclusive). Duplicate elements may occur and the list will not
-#              be sorted.
+# Description: Sorts a list via an adaptive, run-detecting merge sort modeled on
+#              Tim Peters's "TimSort." The list is scanned for naturally
+#              occurring runs (strictly descending runs are reversed), short
+#              runs are extended to a minimum length via binary insertion sort,
+#              and runs are merged according to the usual stack invariants.
+#              Merges switch to "galloping" (exponential search) when one run
+#              keeps winning, so presorted and mostly sorted lists are sorted in
+#              close to linear time. The sort is stable.
 #
-#      Inputs: n - The length of the list as well as one more than the maximum
-#                  value of its elements.
+#      Inputs: list - The list to be sorted.
 #
-#     Outputs: A random list of 'n' integers between 0 and 'n' (exclusive).
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps (i.e., element moves) that occurred.
 #-------------------------------------------------------------------------------
-def createRandomList(n):
-    randomList = []
-    for i in range(n):
-        randomList.append(random.randint(0, n - 1))
+def timSort(list):
+    comparisons, swaps = 0, 0
+    n = len(list)
 
-    return randomList
+    if n < 2:
+        return (comparisons, swaps)
+
+    minRun = computeMinRun(n)
+    runs = []
+    minGallop = MIN_GALLOP
+    low = 0
+    while low < n:
+        (runLength, c, s) = countRunAndMakeAscending(list, low, n)
+        comparisons += c
+        swaps += s
+
+        # Extend short runs via binary insertion sort:
+        if runLength < minRun:
+            forcedLength = min(minRun, n - low)
+            (c, s) = binaryInsertionSortOverRange(list, low,
+                                                  low + forcedLength - 1,
+                                                  low + runLength)
+            comparisons += c
+            swaps += s
+            runLength = forcedLength
+
+        runs.append((low, runLength))
+        low += runLength
+        (minGallop, c, s) = mergeCollapse(list, runs, minGallop)
+        comparisons += c
+        swaps += s
+
+    (minGallop, c, s) = mergeCollapse(list, runs, minGallop, True)
+    comparisons += c
+    swaps += s
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: computeMinRun
+#
+# Description: Computes the minimum run length for 'timSort': 'n' itself if it
+#              is less than 64, otherwise a value between 32 and 64 such that
+#              n / minRun is, or is slightly less than, a power of two.
+#
+#      Inputs: n - The length of the list to be sorted.
+#
+#     Outputs: The minimum run length.
+#-------------------------------------------------------------------------------
+def computeMinRun(n):
+    remainder = 0
+    while n >= 64:
+        remainder |= n & 1
+        n >>= 1
+
+    return n + remainder
+
+#-------------------------------------------------------------------------------
+#    Function: countRunAndMakeAscending
+#
+# Description: Determines the length of the run beginning at a given index of a
+#              list. A run is either non-descending or strictly descending;
+#              descending runs are reversed in place (which keeps the sort
+#              stable, since they contain no equal elements).
+#
+#      Inputs: list - The list to be scanned.
+#              low  - Index of the first element of the run.
+#              n    - Length of the list.
+#
+#     Outputs: A tuple containing the length of the run, the number of element
+#              comparisons, and the number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def countRunAndMakeAscending(list, low, n):
+    comparisons, swaps = 0, 0
+
+    runHigh = low + 1
+    if runHigh == n:
+        return (1, comparisons, swaps)
+
+    comparisons += 1
+    if list[runHigh] < list[low]:
+        runHigh += 1
+        while runHigh < n:
+            comparisons += 1
+            if not list[runHigh] < list[runHigh - 1]:
+                break
+            runHigh += 1
+        i, j = low, runHigh - 1
+        while i < j:
+            list[i], list[j] = list[j], list[i]
+            swaps += 1
+            i += 1
+            j -= 1
+    else:
+        runHigh += 1
+        while runHigh < n:
+            comparisons += 1
+            if list[runHigh] < list[runHigh - 1]:
+                break
+            runHigh += 1
+
+    return (runHigh - low, comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: binaryInsertionSortOverRange
+#
+# Description: Sorts a given range of a list via insertion sort, locating each
+#              element's position via binary search. Elements are inserted after
+#              any equal elements, so the sort is stable.
+#
+#      Inputs: list  - The list to be sorted.
+#              low   - Lower bound of the range.
+#              high  - Upper bound of the range.
+#              start - Index of the first element not already known to be in
+#                      order ('low + 1' by default).
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps (i.e., element moves) that occurred.
+#-------------------------------------------------------------------------------
+def binaryInsertionSortOverRange(list, low, high, start=None):
+    comparisons, swaps = 0, 0
+
+    if start is None:
+        start = low + 1
+    for i in range(max(start, low + 1), high + 1):
+        pivot = list[i]
+        left, right = low, i
+        while left < right:
+            mid = (left + right) / 2
+            comparisons += 1
+            if pivot < list[mid]:
+                right = mid
+            else:
+                left = mid + 1
+        if left < i:
+            list[left + 1:i + 1] = list[left:i]
+            list[left] = pivot
+            swaps += i - left
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: mergeCollapse
+#
+# Description: Merges runs on the stack of pending 'timSort' runs until the run
+#              lengths satisfy the stack invariants (each run is longer than the
+#              next two combined, and longer than the next one), or until a
+#              single run remains if forced.
+#
+#      Inputs: list      - The list being sorted.
+#              runs      - The stack of pending runs, as (base, length) tuples.
+#              minGallop - The current galloping threshold.
+#              force     - If 'True', all runs are merged. ('False' by default.)
+#
+#     Outputs: A tuple containing the updated galloping threshold, the number of
+#              element comparisons, and the number of element swaps that
+#              occurred.
+#-------------------------------------------------------------------------------
+def mergeCollapse(list, runs, minGallop, force=False):
+    comparisons, swaps = 0, 0
+
+    while len(runs) > 1:
+        n = len(runs) - 2
+        if force:
+            if n > 0 and runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+        elif (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or \
+             (n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]):
+            if runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+        elif runs[n][1] > runs[n + 1][1]:
+            break
+        (minGallop, c, s) = mergeRunsAt(list, runs, n, minGallop)
+        comparisons += c
+        swaps += s
+
+    return (minGallop, comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: mergeRunsAt
+#
+# Description: Merges two adjacent runs on the stack of pending 'timSort' runs.
+#              Elements of the first run that are no greater than the second
+#              run's first element, and elements of the second run that are no
+#              less than the first run's last element, are already in place and
+#              are skipped. The remainder of the first run is copied to a
+#              temporary buffer and merged forward, galloping whenever one run
+#              wins 'minGallop' times in a row.
+#
+#      Inputs: list      - The list being sorted.
+#              runs      - The stack of pending runs, as (base, length) tuples.
+#              i         - Stack index of the first of the two runs.
+#              minGallop - The current galloping threshold.
+#
+#     Outputs: A tuple containing the updated galloping threshold, the number of
+#              element comparisons, and the number of element swaps (i.e.,
+#              element moves) that occurred.
+#-------------------------------------------------------------------------------
+def mergeRunsAt(list, runs, i, minGallop):
+    comparisons, swaps = 0, 0
+
+    (base1, length1) = runs[i]
+    (base2, length2) = runs[i + 1]
+    runs[i] = (base1, length1 + length2)
+    del runs[i + 1]
+
+    # Skip elements that are already in place:
+    (k, c) = gallopRight(list[base2], list, base1, length1)
+    comparisons += c
+    base1 += k
+    length1 -= k
+    if length1 == 0:
+        return (minGallop, comparisons, swaps)
+    (length2, c) = gallopLeft(list[base1 + length1 - 1], list, base2, length2)
+    comparisons += c
+    if length2 == 0:
+        return (minGallop, comparisons, swaps)
+
+    buffer = copySlice(list, base1, base1 + length1)
+    swaps += length1
+    cursor1, cursor2, destination = 0, base2, base1
+    done = False
+    while not done:
+        count1, count2 = 0, 0
+
+        # Merge one element at a time until one run starts winning repeatedly:
+        while True:
+            comparisons += 1
+            if list[cursor2] < buffer[cursor1]:
+                list[destination] = list[cursor2]
+                cursor2 += 1
+                length2 -= 1
+                count2 += 1
+                count1 = 0
+            else:
+                list[destination] = buffer[cursor1]
+                cursor1 += 1
+                length1 -= 1
+                count1 += 1
+                count2 = 0
+            destination += 1
+            swaps += 1
+            if length1 == 0 or length2 == 0:
+                done = True
+                break
+            if count1 >= minGallop or count2 >= minGallop:
+                break
+
+        # Gallop until neither run wins by at least 'MIN_GALLOP' elements:
+        while not done:
+            (count1, c) = gallopRight(list[cursor2], buffer, cursor1, length1)
+            comparisons += c
+            if count1:
+                list[destination:destination + count1] = \
+                    buffer[cursor1:cursor1 + count1]
+                destination += count1
+                cursor1 += count1
+                length1 -= count1
+                swaps += count1
+                if length1 == 0:
+                    done = True
+                    break
+            list[destination] = list[cursor2]
+            destination += 1
+            cursor2 += 1
+            length2 -= 1
+            swaps += 1
+            if length2 == 0:
+                done = True
+                break
+
+            (count2, c) = gallopLeft(buffer[cursor1], list, cursor2, length2)
+            comparisons += c
+            if count2:
+                list[destination:destination + count2] = \
+                    list[cursor2:cursor2 + count2]
+                destination += count2
+                cursor2 += count2
+                length2 -= count2
+                swaps += count2
+                if length2 == 0:
+                    done = True
+                    break
+            list[destination] = buffer[cursor1]
+            destination += 1
+            cursor1 += 1
+            length1 -= 1
+            swaps += 1
+            if length1 == 0:
+                done = True
+                break
+
+            minGallop = max(minGallop - 1, 1)
+            if count1 < MIN_GALLOP and count2 < MIN_GALLOP:
+                minGallop += 1
+                break
+
+    # Whatever remains of the second run is already in place:
+    if length1:
+        list[destination:destination + length1] = \
+            buffer[cursor1:cursor1 + length1]
+        swaps += length1
+
+    return (minGallop, comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: gallopLeft
+#
+# Description: Locates the position at which a key would be inserted into a
+#              sorted range of a list, before any equal elements, via
+#              exponential search from the start of the range followed by
+#              binary search.
+#
+#      Inputs: key    - The key to be located.
+#              list   - The list containing the sorted range.
+#              base   - Index of the first element of the range.
+#              length - Length of the range.
+#
+#     Outputs: A tuple containing the number of elements in the range that are
+#              less than 'key' and the number of element comparisons that
+#              occurred.
+#-------------------------------------------------------------------------------
+def gallopLeft(key, list, base, length):
+    comparisons = 0
+
+    low, high = 0, length
+    offset = 1
+    while offset <= length:
+        comparisons += 1
+        if not list[base + offset - 1] < key:
+            high = offset - 1
+            break
+        low = offset
+        offset = offset * 2 + 1
+    while low < high:
+        mid = (low + high) / 2
+        comparisons += 1
+        if list[base + mid] < key:
+            low = mid + 1
+        else:
+            high = mid
+
+    return (low, comparisons)
+
+#-------------------------------------------------------------------------------
+#    Function: gallopRight
+#
+# Description: Locates the position at which a key would be inserted into a
+#              sorted range of a list, after any equal elements, via
+#              exponential search from the start of the range followed by
+#              binary search.
+#
+#      Inputs: key    - The key to be located.
+#              list   - The list containing the sorted range.
+#              base   - Index of the first element of the range.
+#              length - Length of the range.
+#
+#     Outputs: A tuple containing the number of elements in the range that are
+#              less than or equal to 'key' and the number of element
+#              comparisons that occurred.
+#-------------------------------------------------------------------------------
+def gallopRight(key, list, base, length):
+    comparisons = 0
+
+    low, high = 0, length
+    offset = 1
+    while offset <= length:
+        comparisons += 1
+        if key < list[base + offset - 1]:
+            high = offset - 1
+            break
+        low = offset
+        offset = offset * 2 + 1
+    while low < high:
+        mid = (low + high) / 2
+        comparisons += 1
+        if key < list[base + mid]:
+            high = mid
+        else:
+            low = mid + 1
+
+    return (low, comparisons)
+
+#-------------------------------------------------------------------------------
+#    Function: hashSort
+#
+# Description: Sorts a list via the "hash sort" strategy. Assumes that each
+#              value in the list will be less than the length of the list. (For
+#              arbitrary integers, see 'integerSort'.)
+#
+#      Inputs: list - The list to be sorted.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def hashSort(list):
+    if isinstance(list, memoryview):
+        return sortByteValues(list, hashSort)
+    comparisons, swaps = 0, 0
+
+    hashTable = [0] * len(list)
+    for value in list:
+        hashTable[value] += 1
+
+    j = 0
+    for i in range(len(list)):
+        while hashTable[j] < 1:
+            j += 1
+            comparisons += 1
+        comparisons += 1
+        if list[i] != j:
+            list[i] = j
+            swaps += 1
+        hashTable[j] -= 1
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: introSort
+#
+# Description: Sorts the elements of a list via the "introspective sort"
+#              strategy: an iterative quick sort that pivots on the median of
+#              three elements (or the "ninther," the median of three medians of
+#              three, for larger ranges), keeps pending ranges on an explicit
+#              stack (always sorting the smaller partition first, so the stack
+#              holds at most log2(n) ranges), finishes small ranges with an
+#              insertion sort, and falls back to a heap sort for any range whose
+#              partitioning depth exceeds 2 * log2(n). Unlike 'quickSort', it
+#              requires no recursion and never degrades to O(n^2). The sort is
+#              not stable.
+#
+#      Inputs: list - The list to be sorted.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def introSort(list):
+    comparisons, swaps = 0, 0
+
+    if len(list) < 2:
+        return (comparisons, swaps)
+
+    maxDepth = 2 * int(math.log(len(list), 2))
+    stack = [(0, len(list) - 1, 0)]
+    while stack:
+        (low, high, depth) = stack.pop()
+        while high - low >= INSERTION_SORT_CUTOFF:
+            if depth > maxDepth:
+                (c, s) = heapSortOverRange(list, low, high)
+                comparisons += c
+                swaps += s
+                break
+            depth += 1
+
+            # Move the chosen pivot to the front of the range:
+            (pivotIndex, c) = choosePivot(list, low, high)
+            comparisons += c
+            if pivotIndex != low:
+                list[low], list[pivotIndex] = list[pivotIndex], list[low]
+                swaps += 1
+
+            (pivotIndex, c, s) = partitionOverRange(list, low, high)
+            comparisons += c
+            swaps += s
+
+            # Defer the larger partition and continue with the smaller one:
+            if pivotIndex - low < high - pivotIndex:
+                stack.append((pivotIndex + 1, high, depth))
+                high = pivotIndex - 1
+            else:
+                stack.append((low, pivotIndex - 1, depth))
+                low = pivotIndex + 1
+        else:
+            (c, s) = insertionSortOverRange(list, low, high)
+            comparisons += c
+            swaps += s
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: partitionOverRange
+#
+# Description: Partitions a given range of a list around its first element
+#              (Hoare's scheme): afterward, no element before the pivot is
+#              greater than it and no element after the pivot is less than it.
+#              Elements equal to the pivot stop both scans, so ranges with many
+#              duplicates are still split near the middle.
+#
+#      Inputs: list - The list to be partitioned.
+#              low  - Lower bound of the range; also the pivot.
+#              high - Upper bound of the range.
+#
+#     Outputs: A tuple containing the pivot's final index, the number of
+#              element comparisons, and the number of element swaps that
+#              occurred.
+#-------------------------------------------------------------------------------
+def partitionOverRange(list, low, high):
+    comparisons, swaps = 0, 0
+
+    pivot = list[low]
+    i = low
+    j = high + 1
+    while True:
+        i += 1
+        while i < high:
+            comparisons += 1
+            if not list[i] < pivot:
+                break
+            i += 1
+        j -= 1
+        comparisons += 1
+        while pivot < list[j]:
+            j -= 1
+            comparisons += 1
+        if i >= j:
+            break
+        list[i], list[j] = list[j], list[i]
+        swaps += 1
+
+    if j != low:
+        list[low], list[j] = list[j], list[low]
+        swaps += 1
+
+    return (j, comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: choosePivot
+#
+# Description: Chooses a pivot for a given range of a list: the median of its
+#              first, middle, and last elements, or, for ranges longer than
+#              'NINTHER_CUTOFF', the median of the medians of three evenly
+#              spaced groups of three elements (Tukey's "ninther").
+#
+#      Inputs: list - The list containing the range.
+#              low  - Lower bound of the range.
+#              high - Upper bound of the range.
+#
+#     Outputs: A tuple containing the index of the chosen pivot and the number
+#              of element comparisons that occurred.
+#-------------------------------------------------------------------------------
+def choosePivot(list, low, high):
+    mid = (high - low) / 2 + low
+    if high - low < NINTHER_CUTOFF:
+        return medianOfThree(list, low, mid, high)
+
+    step = (high - low) / 8
+    (a, c1) = medianOfThree(list, low, low + step, low + 2 * step)
+    (b, c2) = medianOfThree(list, mid - step, mid, mid + step)
+    (c, c3) = medianOfThree(list, high - 2 * step, high - step, high)
+    (pivotIndex, c4) = medianOfThree(list, a, b, c)
+
+    return (pivotIndex, c1 + c2 + c3 + c4)
+
+#-------------------------------------------------------------------------------
+#    Function: medianOfThree
+#
+# Description: Determines which of three elements of a list holds the median
+#              value.
+#
+#      Inputs: list    - The list containing the elements.
+#              a, b, c - Indices of the elements.
+#
+#     Outputs: A tuple containing the index of the median element and the
+#              number of element comparisons that occurred.
+#-------------------------------------------------------------------------------
+def medianOfThree(list, a, b, c):
+    if list[a] < list[b]:
+        if list[b] < list[c]:
+            return (b, 2)
+        if list[a] < list[c]:
+            return (c, 3)
+        return (a, 3)
+    if list[c] < list[b]:
+        return (b, 2)
+    if list[c] < list[a]:
+        return (c, 3)
+    return (a, 3)
+
+#-------------------------------------------------------------------------------
+#    Function: insertionSortOverRange
+#
+# Description: Sorts a given range of a list via the "insertion sort" strategy.
+#              Efficient for short or nearly sorted ranges.
+#
+#      Inputs: list - The list to be sorted.
+#              low  - Lower bound of the range.
+#              high - Upper bound of the range.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def insertionSortOverRange(list, low, high):
+    comparisons, swaps = 0, 0
+
+    for i in range(low + 1, high + 1):
+        j = i
+        while j > low:
+            comparisons += 1
+            if not list[j] < list[j - 1]:
+                break
+            list[j], list[j - 1] = list[j - 1], list[j]
+            swaps += 1
+            j -= 1
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: heapSortOverRange
+#
+# Description: Sorts a given range of a list via the "heap sort" strategy,
+#              using O(1) extra memory and O(n log n) time in the worst case.
+#
+#      Inputs: list - The list to be sorted.
+#              low  - Lower bound of the range.
+#              high - Upper bound of the range.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def heapSortOverRange(list, low, high):
+    comparisons, swaps = 0, 0
+    n = high - low + 1
+
+    # Build a max heap:
+    for root in range(n / 2 - 1, -1, -1):
+        (c, s) = siftDown(list, low, root, n)
+        comparisons += c
+        swaps += s
+
+    # Repeatedly move the largest remaining element to the end of the range:
+    for end in range(n - 1, 0, -1):
+        list[low], list[low + end] = list[low + end], list[low]
+        swaps += 1
+        (c, s) = siftDown(list, low, 0, end)
+        comparisons += c
+        swaps += s
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: siftDown
+#
+# Description: Restores the max heap property below a given node of a heap
+#              stored within a list, by moving that node's element down until
+#              neither of its children is greater.
+#
+#      Inputs: list   - The list containing the heap.
+#              offset - Index of the heap's first element within the list.
+#              root   - Heap index of the node to be sifted down.
+#              size   - Number of elements in the heap.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def siftDown(list, offset, root, size):
+    comparisons, swaps = 0, 0
+
+    child = 2 * root + 1
+    while child < size:
+        if child + 1 < size:
+            comparisons += 1
+            if list[offset + child] < list[offset + child + 1]:
+                child += 1
+        comparisons += 1
+        if not list[offset + root] < list[offset + child]:
+            break
+        list[offset + root], list[offset + child] = \
+                             list[offset + child], list[offset + root]
+        swaps += 1
+        root = child
+        child = 2 * root + 1
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: heapSort
+#
+# Description: Sorts the elements of a list via the "bottom-up heap sort"
+#              strategy, using O(1) extra memory and O(n log n) time in the
+#              worst case. Elements are sifted down via 'bottomUpSiftDown',
+#              which needs roughly half as many comparisons as the standard
+#              sift-down used by 'heapSortOverRange'. The sort is not stable.
+#
+#      Inputs: list - The list to be sorted.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def heapSort(list):
+    comparisons, swaps = 0, 0
+    n = len(list)
+
+    # Build a max heap:
+    for root in range(n / 2 - 1, -1, -1):
+        (c, s) = bottomUpSiftDown(list, root, n)
+        comparisons += c
+        swaps += s
+
+    # Repeatedly move the largest remaining element to the end of the list:
+    for end in range(n - 1, 0, -1):
+        list[0], list[end] = list[end], list[0]
+        swaps += 1
+        (c, s) = bottomUpSiftDown(list, 0, end)
+        comparisons += c
+        swaps += s
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: bottomUpSiftDown
+#
+# Description: Restores the max heap property below a given node of a heap
+#              stored at the start of a list, using Floyd's optimization: the
+#              path of larger children is followed all the way down to a leaf
+#              (one comparison per level), then climbed back up to find the
+#              node's proper place, which is usually near the bottom. The
+#              elements along the path are then shifted up one level each.
+#
+#      Inputs: list - The list containing the heap.
+#              root - Index of the node to be sifted down.
+#              size - Number of elements in the heap.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps (i.e., the number of elements shifted)
+#              that occurred.
+#-------------------------------------------------------------------------------
+def bottomUpSiftDown(list, root, size):
+    comparisons, swaps = 0, 0
+
+    # Descend to a leaf along the path of larger children:
+    leaf = root
+    child = 2 * leaf + 1
+    while child < size:
+        if child + 1 < size:
+            comparisons += 1
+            if list[child] < list[child + 1]:
+                child += 1
+        leaf = child
+        child = 2 * leaf + 1
+
+    # Climb back up to the deepest node on the path that is greater than the
+    # root's element:
+    value = list[root]
+    while leaf != root:
+        comparisons += 1
+        if value < list[leaf]:
+            break
+        leaf = (leaf - 1) / 2
+
+    # Put the root's element there, shifting its ancestors up one level:
+    while leaf != root:
+        list[leaf], value = value, list[leaf]
+        swaps += 1
+        leaf = (leaf - 1) / 2
+    list[root] = value
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: shellSort
+#
+# Description: Sorts the elements of a list via the "Shell sort" strategy:
+#              insertion sorts over elements a given gap apart, for a
+#              decreasing sequence of gaps ending in 1. Uses O(1) extra memory.
+#              The sort is not stable.
+#
+#      Inputs: list - The list to be sorted.
+#              gaps - Name of the gap sequence to be used (one of the keys of
+#                     SHELL_SORT_GAP_SEQUENCES; 'ciura' by default).
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps (i.e., the number of elements shifted)
+#              that occurred.
+#-------------------------------------------------------------------------------
+def shellSort(list, gaps='ciura'):
+    comparisons, swaps = 0, 0
+    n = len(list)
+
+    for gap in shellSortGaps(n, gaps):
+        for i in range(gap, n):
+            value = list[i]
+            j = i
+            while j >= gap:
+                comparisons += 1
+                if not value < list[j - gap]:
+                    break
+                list[j] = list[j - gap]
+                swaps += 1
+                j -= gap
+            list[j] = value
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: shellSortGaps
+#
+# Description: Generates the gaps of a given Shell sort gap sequence that are
+#              smaller than a given list length:
+#                  ciura     - 1, 4, 10, 23, 57, 132, 301, 701, 1750, then
+#                              each gap is 2.25 times the previous one.
+#                  tokuda    - ceil((9^k - 4^k) / (5 * 4^(k - 1))): 1, 4, 9,
+#                              20, 46, 103, ...
+#                  sedgewick - 1, then 4^k + 3 * 2^(k - 1) + 1: 8, 23, 77,
+#                              281, ...
+#
+#      Inputs: n    - The length of the list to be sorted.
+#              name - Name of the gap sequence (a key of
+#                     SHELL_SORT_GAP_SEQUENCES).
+#
+#     Outputs: A list of gaps, in decreasing order and ending in 1 (or empty if
+#              'n' is less than 2).
+#-------------------------------------------------------------------------------
+def shellSortGaps(n, name):
+    if name not in SHELL_SORT_GAP_SEQUENCES:
+        raise ValueError('Unknown gap sequence: ' + repr(name))
+    nextGap = SHELL_SORT_GAP_SEQUENCES[name]
+
+    gaps = []
+    k = 1
+    gap = 1
+    while gap < n:
+        gaps.append(gap)
+        gap = nextGap(k, gap)
+        k += 1
+    gaps.reverse()
+
+    return gaps
+
+#-------------------------------------------------------------------------------
+#    Function: integerSort
+#
+# Description: Sorts a list of integers in linear time, choosing between
+#              'countingSort' and 'radixSort' according to the range of values:
+#              counting sort is used if the range is no more than
+#              'COUNTING_SORT_RANGE_FACTOR' times the length of the list,
+#              otherwise radix sort is used.
+#
+#      Inputs: list - The list of integers to be sorted.
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def integerSort(list):
+    if isinstance(list, memoryview):
+        return sortByteValues(list, integerSort)
+    if len(list) < 2:
+        return (0, 0)
+
+    (minimum, maximum, comparisons) = findMinAndMax(list)
+    if maximum - minimum + 1 <= COUNTING_SORT_RANGE_FACTOR * len(list):
+        (c, swaps) = countingSort(list, (minimum, maximum))
+    else:
+        (c, swaps) = radixSort(list, (minimum, maximum))
+
+    return (comparisons + c, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: countingSort
+#
+# Description: Sorts a list of integers via the "counting sort" strategy: the
+#              occurrences of each value between the list's minimum and maximum
+#              are counted, then the list is rewritten in order. Unlike
+#              'hashSort', values may be negative or exceed the length of the
+#              list, though memory use is proportional to the range of values.
+#
+#      Inputs: list   - The list of integers to be sorted.
+#              bounds - A tuple containing the minimum and maximum values in
+#                       the list, if already known. ('None' by default.)
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def countingSort(list, bounds=None):
+    if isinstance(list, memoryview):
+        return sortByteValues(list, countingSort, bounds)
+    comparisons, swaps = 0, 0
+
+    if len(list) < 2:
+        return (comparisons, swaps)
+
+    if bounds:
+        (minimum, maximum) = bounds
+    else:
+        (minimum, maximum, comparisons) = findMinAndMax(list)
+
+    counts = [0] * (maximum - minimum + 1)
+    for value in list:
+        counts[value - minimum] += 1
+
+    i = 0
+    for offset in range(len(counts)):
+        comparisons += 1
+        value = minimum + offset
+        for j in range(counts[offset]):
+            if list[i] != value:
+                list[i] = value
+                swaps += 1
+            i += 1
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: radixSort
+#
+# Description: Sorts a list of integers via a least significant digit "radix
+#              sort," one byte at a time. Values are offset by the list's
+#              minimum, so negative values are handled, and passes over bytes
+#              that are the same for every value are skipped. Each pass is a
+#              stable counting sort into a buffer allocated once up front, so
+#              the sort as a whole is stable.
+#
+#      Inputs: list   - The list of integers to be sorted.
+#              bounds - A tuple containing the minimum and maximum values in
+#                       the list, if already known. ('None' by default.)
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps (i.e., element moves) that occurred.
+#-------------------------------------------------------------------------------
+def radixSort(list, bounds=None):
+    if isinstance(list, memoryview):
+        return sortByteValues(list, radixSort, bounds)
+    comparisons, swaps = 0, 0
+    n = len(list)
+
+    if n < 2:
+        return (comparisons, swaps)
+
+    if bounds:
+        (minimum, maximum) = bounds
+    else:
+        (minimum, maximum, comparisons) = findMinAndMax(list)
+
+    source = list
+    destination = createScratchBuffer(list, n)
+    shift = 0
+    while (maximum - minimum) >> shift:
+        # Count the occurrences of each byte value:
+        counts = [0] * (RADIX + 1)
+        for value in source:
+            counts[(((value - minimum) >> shift) & (RADIX - 1)) + 1] += 1
+        if n in counts:
+            shift += RADIX_BITS
+            continue
+
+        # Convert counts to starting positions, then distribute the values:
+        for digit in range(RADIX):
+            counts[digit + 1] += counts[digit]
+        for value in source:
+            digit = ((value - minimum) >> shift) & (RADIX - 1)
+            destination[counts[digit]] = value
+            counts[digit] += 1
+        swaps += n
+        source, destination = destination, source
+        shift += RADIX_BITS
+
+    # If the last pass distributed values into the buffer, copy them back:
+    if source is not list:
+        list[:] = source
+        swaps += n
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: sortByteValues
+#
+# Description: Sorts a view of a byte buffer with one of the integer sorts
+#              (including 'hashSort'). Its elements are one-character strings,
+#              which the integer sorts cannot do arithmetic on, so the bytes
+#              are copied into an array of their values, sorted there, and
+#              copied back.
+#
+#      Inputs: view         - A writable memoryview of a byte buffer.
+#              sortFunction - The integer sort to be used.
+#              bounds       - A tuple containing the minimum and maximum byte
+#                             values, if already known. ('None' by default.)
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def sortByteValues(view, sortFunction, bounds=None):
+    values = array.array('B', view.tobytes())
+    if bounds is None:
+        result = sortFunction(values)
+    else:
+        result = sortFunction(values, bounds)
+    view[:] = values.tostring()
+
+    return result
+
+#-------------------------------------------------------------------------------
+#    Function: findMinAndMax
+#
+# Description: Finds the minimum and maximum values in a non-empty list.
+#
+#      Inputs: list - The list to be scanned.
+#
+#     Outputs: A tuple containing the minimum value, the maximum value, and the
+#              number of element comparisons that occurred.
+#-------------------------------------------------------------------------------
+def findMinAndMax(list):
+    comparisons = 0
+
+    minimum = maximum = list[0]
+    for value in list:
+        comparisons += 1
+        if value < minimum:
+            minimum = value
+        else:
+            comparisons += 1
+            if value > maximum:
+                maximum = value
+
+    return (minimum, maximum, comparisons)
+
+#-------------------------------------------------------------------------------
+#    Function: createScratchBuffer
+#
+# Description: Creates a scratch buffer suitable for holding elements of a given
+#              sequence, of the same type as that sequence (a list, a typed
+#              array with the same type code, or a writable view of a byte
+#              buffer), so that slices may be copied freely between the two.
+#
+#      Inputs: sequence - The sequence whose elements will be stored.
+#              n        - The length of the buffer.
+#
+#     Outputs: A new buffer of length 'n'.
+#-------------------------------------------------------------------------------
+def createScratchBuffer(sequence, n):
+    if isinstance(sequence, array.array):
+        return array.array(sequence.typecode, [0]) * n
+    if isinstance(sequence, memoryview):
+        return memoryview(bytearray(n))
+
+    return [None] * n
+
+#-------------------------------------------------------------------------------
+#    Function: copySlice
+#
+# Description: Copies a slice of a sequence. Unlike ordinary slicing, this
+#              yields an independent copy for memoryviews (whose slices share
+#              memory with the original).
+#
+#      Inputs: sequence - The sequence to be copied.
+#              low      - Lower bound of the slice (inclusive).
+#              high     - Upper bound of the slice (exclusive).
+#
+#     Outputs: A copy of the slice, of the same type as the sequence.
+#-------------------------------------------------------------------------------
+def copySlice(sequence, low, high):
+    if isinstance(sequence, memoryview):
+        return memoryview(bytearray(sequence[low:high].tobytes()))
+
+    return sequence[low:high]
+
+#-------------------------------------------------------------------------------
+#    Function: assignContents
+#
+# Description: Replaces the contents of a sequence (a list, a typed array, or a
+#              writable view of a byte buffer) with the elements of a list of
+#              the same length, in place.
+#
+#      Inputs: sequence - The sequence to be overwritten.
+#              values   - A list of the new elements.
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def assignContents(sequence, values):
+    if isinstance(sequence, array.array):
+        sequence[:] = array.array(sequence.typecode, values)
+    elif isinstance(sequence, memoryview):
+        sequence[:] = ''.join(values)
+    else:
+        sequence[:] = values
+
+#-------------------------------------------------------------------------------
+#    Function: createTypedArray
+#
+# Description: Creates a typed array (an 'array.array') of a given length from
+#              a registered input distribution. Each element takes only as many
+#              bytes as its type code requires, rather than being a separate
+#              Python object, which greatly reduces the memory needed to hold
+#              very large data sets. Random data is generated directly into the
+#              array via NumPy, if available.
+#
+#      Inputs: n            - The length of the array.
+#              distribution - Name of the registered input distribution to use
+#                             ('random' by default).
+#              typecode     - The array's type code ('TYPED_ARRAY_TYPECODE' by
+#                             default).
+#
+#     Outputs: A new typed array of length 'n'.
+#-------------------------------------------------------------------------------
+def createTypedArray(n, distribution='random', typecode=None):
+    if typecode is None:
+        typecode = TYPED_ARRAY_TYPECODE
+
+    if numpy and distribution == 'random' and n >= VECTORIZE_THRESHOLD:
+        generator = numpy.random.RandomState(random.getrandbits(32))
+        values = generator.randint(0, n, n).astype(typecode)
+        typedArray = array.array(typecode)
+        typedArray.fromstring(values.tostring())
+        return typedArray
+
+    return array.array(typecode, DISTRIBUTIONS[distribution][0](n))
+
+#-------------------------------------------------------------------------------
+#    Function: sortWithKey
+#
+# Description: Sorts a list by a key function, and/or in descending order, via
+#              a given sort function. Keys are computed once per element
+#              ("decorate, sort, undecorate"): each element's key is paired
+#              with its original position, the pairs are sorted, and the list
+#              is then rearranged to match. Because ties between equal keys are
+#              broken by original position, the result is stable regardless of
+#              whether the sort function itself is stable, and equal elements
+#              keep their original order even when 'reverse' is 'True' (as with
+#              Python's built-in 'sorted').
+#
+#              For the integer sorts ('countingSort', 'radixSort', and
+#              'integerSort'), keys must be integers; each key and position are
+#              combined into a single integer rather than a tuple. Since this
+#              multiplies the range of values by the length of the list,
+#              'integerSort' or 'radixSort' are recommended. 'hashSort' cannot
+#              sort by key.
+#
+#      Inputs: sortFunction - The sort function to be used.
+#              list         - The list to be sorted.
+#              key          - A function of one argument returning the value by
+#                             which each element is to be sorted, or 'None' to
+#                             compare the elements themselves. ('None' by
+#                             default.)
+#              reverse      - If 'True', the list is sorted in descending order.
+#                             ('False' by default.)
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps performed by the sort function on the
+#              decorated list.
+#-------------------------------------------------------------------------------
+def sortWithKey(sortFunction, list, key=None, reverse=False):
+    if key is None and not reverse:
+        return sortFunction(list)
+    if sortFunction is hashSort:
+        raise ValueError('hashSort cannot sort by key; use integerSort')
+
+    n = len(list)
+    if key is None:
+        keys = list
+    else:
+        keys = map(key, list)
+
+    # Ties are broken by position (or by reversed position, since the order of
+    # the sorted list will be reversed afterward):
+    if reverse:
+        positions = range(n - 1, -1, -1)
+    else:
+        positions = range(n)
+    if sortFunction.__name__ in INTEGER_SORT_FUNCTION_NAMES:
+        decorated = [k * n + position for (k, position)
+                     in zip(keys, positions)]
+    else:
+        decorated = zip(keys, positions)
+
+    (comparisons, swaps) = sortFunction(decorated)
+
+    if sortFunction.__name__ in INTEGER_SORT_FUNCTION_NAMES:
+        positions = [d % n for d in decorated]
+    else:
+        positions = [d[1] for d in decorated]
+    if reverse:
+        positions.reverse()
+        positions = [n - 1 - position for position in positions]
+    assignContents(list, [list[position] for position in positions])
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: externalSort
+#
+# Description: Sorts data too large to fit in memory via an "external merge
+#              sort." The input is read in chunks of roughly 'memoryBudget'
+#              bytes (as estimated via 'sys.getsizeof'), each chunk is sorted
+#              via the given sort function and written to a temporary file as a
+#              sorted run, and the runs are then merged with a heap, 'fanIn' at
+#              a time (in multiple passes if necessary), via buffered reads.
+#              The final pass writes to the output file. If the whole input
+#              fits in a single chunk, it is sorted in memory and written
+#              straight to the output file instead.
+#
+#      Inputs: fin          - An open input file handle (or any iterable of
+#                             lines) containing one integer (or one line of
+#                             text) per line.
+#              fout         - An open output file handle.
+#              sortFunction - The sort function used to sort each chunk
+#                             ('timSort' by default).
+#              memoryBudget - Approximate number of bytes of memory to use for
+#                             each chunk and for the read buffers of each merge
+#                             ('EXTERNAL_SORT_MEMORY_BUDGET' by default).
+#              fanIn        - Maximum number of runs to merge at once
+#                             ('EXTERNAL_SORT_FAN_IN' by default).
+#              numeric      - If 'True', each line is parsed as an integer and
+#                             blank lines are ignored; otherwise lines are
+#                             sorted as strings. ('True' by default.)
+#              tempDir      - Directory in which to create temporary files, or
+#                             'None' for the system default. ('None' by
+#                             default.)
+#              unique       - If 'True', only the first of each set of equal
+#                             values is written. ('False' by default.)
+#
+#     Outputs: A dictionary containing the number of 'runs' created, the number
+#              of merge 'passes', the number of 'bytesRead' and 'bytesWritten'
+#              (including temporary files), and the 'comparisons' and 'swaps'
+#              performed while sorting the chunks.
+#-------------------------------------------------------------------------------
+def externalSort(fin, fout, sortFunction=None, memoryBudget=None, fanIn=None,
+                 numeric=True, tempDir=None, unique=False):
+    if sortFunction is None:
+        sortFunction = timSort
+    if memoryBudget is None:
+        memoryBudget = EXTERNAL_SORT_MEMORY_BUDGET
+    if fanIn is None:
+        fanIn = EXTERNAL_SORT_FAN_IN
+    if fanIn < 2:
+        raise ValueError('fanIn must be at least 2')
+
+    stats = {'runs': 0, 'passes': 0, 'bytesRead': 0, 'bytesWritten': 0,
+             'comparisons': 0, 'swaps': 0}
+    directory = None
+    try:
+        # Read, sort, and store chunks of the input as sorted runs:
+        runs = []
+        chunk = []
+        chunkSize = 0
+        for line in fin:
+            stats['bytesRead'] += len(line)
+            if numeric:
+                line = line.strip()
+                if not line:
+                    continue
+                value = int(line)
+            elif line.endswith('\n'):
+                value = line
+            else:
+                value = line + '\n'
+            chunk.append(value)
+            chunkSize += sys.getsizeof(value) + POINTER_SIZE
+            if chunkSize >= memoryBudget:
+                if directory is None:
+                    directory = tempfile.mkdtemp(prefix='external_sort_',
+                                                 dir=tempDir)
+                runs.append(writeSortedRun(chunk, sortFunction, directory,
+                                           stats, unique))
+                chunk = []
+                chunkSize = 0
+        if not runs:
+            stats['runs'] = 1
+            writeSortedRun(chunk, sortFunction, None, stats, unique, fout)
+            return stats
+        if chunk:
+            runs.append(writeSortedRun(chunk, sortFunction, directory, stats,
+                                       unique))
+        del chunk
+        stats['runs'] = len(runs)
+
+        # Merge runs, 'fanIn' at a time, until 'fanIn' or fewer remain:
+        bufferSize = max(memoryBudget / (fanIn + 1), io.DEFAULT_BUFFER_SIZE)
+        while len(runs) > fanIn:
+            mergedRuns = []
+            for i in range(0, len(runs), fanIn):
+                if i + 1 == len(runs):
+                    mergedRuns.append(runs[i])
+                    continue
+                (handle, filename) = tempfile.mkstemp(suffix='.run',
+                                                      dir=directory)
+                runOut = os.fdopen(handle, 'w', bufferSize)
+                mergeSortedRuns(runs[i:i + fanIn], runOut, numeric,
+                                bufferSize, stats, unique)
+                runOut.close()
+                mergedRuns.append(filename)
+            runs = mergedRuns
+            stats['passes'] += 1
+
+        # Merge the remaining runs into the output file:
+        mergeSortedRuns(runs, fout, numeric, bufferSize, stats, unique)
+        stats['passes'] += 1
+    finally:
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    return stats
+
+#-------------------------------------------------------------------------------
+#    Function: writeSortedRun
+#
+# Description: Sorts a chunk of values and writes them, one per line, to a new
+#              temporary file (or to a given output file) for 'externalSort'.
+#
+#      Inputs: chunk        - The list of values (integers or lines of text) to
+#                             be sorted.
+#              sortFunction - The sort function to be used.
+#              directory    - Directory in which to create the file.
+#              stats        - The dictionary of statistics to be updated.
+#              unique       - If 'True', only the first of each set of equal
+#                             values is written. ('False' by default.)
+#              fout         - If given, an open output file handle to which
+#                             the values are written instead. ('None' by
+#                             default.)
+#
+#     Outputs: The name of the new file (or 'None' if 'fout' was given).
+#-------------------------------------------------------------------------------
+def writeSortedRun(chunk, sortFunction, directory, stats, unique=False,
+                   fout=None):
+    (comparisons, swaps) = sortFunction(chunk)
+    stats['comparisons'] += comparisons
+    stats['swaps'] += swaps
+
+    filename = None
+    if fout is None:
+        (handle, filename) = tempfile.mkstemp(suffix='.run', dir=directory)
+        runOut = os.fdopen(handle, 'w')
+    else:
+        runOut = fout
+    values = chunk
+    if unique:
+        values = (value for (value, group) in itertools.groupby(values))
+    if not chunk or not isinstance(chunk[0], str):
+        values = ('%d\n' % value for value in values)
+    stats['bytesWritten'] += writeLinesInBatches(runOut, values)
+    if fout is None:
+        runOut.close()
+
+    return filename
+
+#-------------------------------------------------------------------------------
+#    Function: mergeSortedRuns
+#
+# Description: Merges sorted run files for 'externalSort' via a heap, writing
+#              the merged values to an output file.
+#
+#      Inputs: filenames  - Names of the run files to be merged.
+#              fout       - An open output file handle.
+#              numeric    - If 'True', the runs contain integers; otherwise
+#                           they contain lines of text.
+#              bufferSize - Size of the read buffer for each run, in bytes.
+#              stats      - The dictionary of statistics to be updated.
+#              unique     - If 'True', only the first of each set of equal
+#                           values is written. ('False' by default.)
+#
+#     Outputs: None. However, the merged values are written to the output file.
+#-------------------------------------------------------------------------------
+def mergeSortedRuns(filenames, fout, numeric, bufferSize, stats, unique=False):
+    runFiles = [open(filename, 'r', bufferSize) for filename in filenames]
+    try:
+        if numeric:
+            merged = heapq.merge(*[itertools.imap(int, runFile)
+                                   for runFile in runFiles])
+        else:
+            merged = heapq.merge(*runFiles)
+        if unique:
+            merged = (value for (value, group) in itertools.groupby(merged))
+        if numeric:
+            merged = ('%d\n' % value for value in merged)
+        writeLinesInBatches(fout, merged)
+    finally:
+        for runFile in runFiles:
+            runFile.close()
+
+    bytesMerged = sum(os.path.getsize(filename) for filename in filenames)
+    stats['bytesRead'] += bytesMerged
+    stats['bytesWritten'] += bytesMerged
+
+#-------------------------------------------------------------------------------
+#    Function: writeLinesInBatches
+#
+# Description: Writes lines of text to a file in large batches, joining each
+#              batch into a single string so that one 'write' call is made per
+#              batch rather than per line.
+#
+#      Inputs: fout      - An open output file handle.
+#              lines     - An iterable of lines, each ending in a newline.
+#              batchSize - Number of lines per batch (WRITE_BATCH_SIZE by
+#                          default).
+#
+#     Outputs: The number of bytes written.
+#-------------------------------------------------------------------------------
+def writeLinesInBatches(fout, lines, batchSize=None):
+    if batchSize is None:
+        batchSize = WRITE_BATCH_SIZE
+
+    bytesWritten = 0
+    lines = iter(lines)
+    batch = ''.join(itertools.islice(lines, batchSize))
+    while batch:
+        fout.write(batch)
+        bytesWritten += len(batch)
+        batch = ''.join(itertools.islice(lines, batchSize))
+
+    return bytesWritten
+
+#-------------------------------------------------------------------------------
+#    Function: parallelSort
+#
+# Description: Sorts a large list of numbers across multiple processes via a
+#              "sample sort." The list is copied into a shared memory array
+#              (so that worker processes can read and write it without
+#              pickling), and splitters are chosen from a random sample. Each
+#              worker then sorts one contiguous slice of the array via the
+#              given sort function and reports where the splitters fall within
+#              it; finally, each worker merges the pieces of every sorted slice
+#              that fall between two adjacent splitters into its own region of
+#              a second shared array, which is copied back into the list.
+#
+#              Lists shorter than 'PARALLEL_SORT_THRESHOLD', lists that are not
+#              made up entirely of integers that fit in a C long or entirely of
+#              floats (or numeric typed arrays), and requests for a single
+#              process are sorted serially instead.
+#
+#      Inputs: list         - The list to be sorted.
+#              processes    - Number of worker processes to use, or 'None' to
+#                             use one per CPU core. ('None' by default.)
+#              sortFunction - The sort function used to sort each slice (or the
+#                             whole list, if sorted serially). Must be defined
+#                             at module level. ('timSort' by default.)
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps performed by the sort function (the
+#              final merges are not counted).
+#-------------------------------------------------------------------------------
+def parallelSort(list, processes=None, sortFunction=None):
+    if sortFunction is None:
+        sortFunction = timSort
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+
+    n = len(list)
+    if isinstance(list, array.array):
+        typecode = list.typecode
+        if typecode in 'cu':
+            typecode = None
+    else:
+        elementTypes = set(map(type, list))
+        if elementTypes <= set([int, long]) and \
+                (n == 0 or C_LONG_MIN <= min(list) and max(list) <= C_LONG_MAX):
+            typecode = 'l'
+        elif elementTypes == set([float]):
+            typecode = 'd'
+        else:
+            typecode = None
+    if n < PARALLEL_SORT_THRESHOLD or processes < 2 or typecode is None:
+        return sortFunction(list)
+
+    # Choose splitters from an oversampled random sample:
+    sample = random.sample(list, min(n, processes * SAMPLE_SORT_OVERSAMPLING))
+    sample.sort()
+    splitters = [sample[i * len(sample) / processes]
+                 for i in range(1, processes)]
+
+    source = multiprocessing.RawArray(typecode, list)
+    destination = multiprocessing.RawArray(typecode, n)
+    slices = [(i * n / processes, (i + 1) * n / processes)
+              for i in range(processes)]
+    pool = multiprocessing.Pool(processes, initParallelSortWorker,
+                                (source, destination))
+    try:
+        # Sort each slice and find the boundaries between buckets within it:
+        sliceResults = pool.map(sortParallelSlice,
+                                [(low, high, splitters, sortFunction)
+                                 for (low, high) in slices])
+        comparisons = sum(result[0] for result in sliceResults)
+        swaps = sum(result[1] for result in sliceResults)
+
+        # Merge each bucket's pieces into its region of the destination array:
+        merges = []
+        offset = 0
+        for bucket in range(processes):
+            pieces = [(result[2][bucket], result[2][bucket + 1])
+                      for result in sliceResults]
+            merges.append((pieces, offset))
+            offset += sum(high - low for (low, high) in pieces)
+        pool.map(mergeParallelBucket, merges)
+    finally:
+        pool.close()
+        pool.join()
+
+    assignContents(list, destination[:])
+
+    return (comparisons, swaps)
+
+#-------------------------------------------------------------------------------
+#    Function: initParallelSortWorker
+#
+# Description: Initializes a 'parallelSort' worker process by storing the
+#              shared arrays it inherited from the parent process.
+#
+#      Inputs: source      - The shared array containing the data to be sorted.
+#              destination - The shared array into which buckets are merged.
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def initParallelSortWorker(source, destination):
+    global parallelSortSource, parallelSortDestination
+
+    parallelSortSource = source
+    parallelSortDestination = destination
+
+#-------------------------------------------------------------------------------
+#    Function: sortParallelSlice
+#
+# Description: Sorts one slice of the shared source array for 'parallelSort' and
+#              locates the splitters within it.
+#
+#      Inputs: task - A tuple containing the lower bound (inclusive) and upper
+#                     bound (exclusive) of the slice, the list of splitters, and
+#                     the sort function to be used.
+#
+#     Outputs: A tuple containing the number of element comparisons, the number
+#              of element swaps, and a list of the indices that divide the
+#              sorted slice into buckets (one more than the number of buckets,
+#              beginning with the slice's lower bound and ending with its upper
+#              bound).
+#-------------------------------------------------------------------------------
+def sortParallelSlice(task):
+    (low, high, splitters, sortFunction) = task
+
+    values = parallelSortSource[low:high]
+    (comparisons, swaps) = sortFunction(values)
+    parallelSortSource[low:high] = values
+
+    boundaries = [low]
+    for splitter in splitters:
+        boundaries.append(low + bisect.bisect_right(values, splitter))
+    boundaries.append(high)
+
+    return (comparisons, swaps, boundaries)
+
+#-------------------------------------------------------------------------------
+#    Function: mergeParallelBucket
+#
+# Description: Merges the sorted pieces of one bucket of the shared source array
+#              into the shared destination array for 'parallelSort'.
+#
+#      Inputs: task - A tuple containing a list of (low, high) index pairs
+#                     identifying the sorted pieces, and the index within the
+#                     destination array at which the merged bucket begins.
+#
+#     Outputs: None.
+#-------------------------------------------------------------------------------
+def mergeParallelBucket(task):
+    (pieces, offset) = task
+
+    runs = [parallelSortSource[low:high] for (low, high) in pieces]
+    merged = [value for value in heapq.merge(*runs)]
+    parallelSortDestination[offset:offset + len(merged)] = merged
+
+#-------------------------------------------------------------------------------
+#    Function: measureParallelSpeedup
+#
+# Description: Measures the wall time of 'parallelSort' on the same list with
+#              various numbers of processes, relative to sorting it serially.
+#
+#      Inputs: n             - The length of the list to be sorted.
+#              processCounts - The numbers of processes to test (1, 2, 4,
+#                              etc., up to the number of CPU cores, by
+#                              default).
+#              repetitions   - Number of timed runs per process count; the
+#                              best time is reported. (3 by default.)
+#              distribution  - Name of the registered input distribution to
+#                              use ('random' by default).
+#              sortFunction  - The sort function to be used ('timSort' by
+#                              default).
+#
+#     Outputs: A list of dictionaries, one per process count, containing the
+#              number of 'processes', the best 'wallTime' (in seconds), and the
+#              'speedup' relative to a single process.
+#-------------------------------------------------------------------------------
+def measureParallelSpeedup(n, processCounts=None, repetitions=3,
+                           distribution='random', sortFunction=None):
+    if processCounts is None:
+        processCounts = [1]
+        while processCounts[-1] * 2 <= multiprocessing.cpu_count():
+            processCounts.append(processCounts[-1] * 2)
+
+    original = DISTRIBUTIONS[distribution][0](n)
+    results = []
+    for processes in processCounts:
+        wallTimes = []
+        for i in range(repetitions):
+            testList = original[:]
+            startTime = timeit.default_timer()
+            parallelSort(testList, processes, sortFunction)
+            wallTimes.append(timeit.default_timer() - startTime)
+        results.append({'processes': processes,
+                        'wallTime':  min(wallTimes),
+                        'speedup':   results[0]['wallTime'] / min(wallTimes)
+                                     if results else 1.0})
+
+    return results
+
+#-------------------------------------------------------------------------------
+#       Class: SortedList
+#
+# Description: A list that keeps its elements in ascending order as they are
+#              added and removed, so that it never needs to be re-sorted. The
+#              elements are stored in a list of sorted "chunks" of at most
+#              2 * SORTED_LIST_CHUNK_SIZE elements each, along with the largest
+#              element of each chunk: an element is located by binary search
+#              over the chunk maximums, then within its chunk, so insertion and
+#              removal only ever shift the elements of one short chunk.
+#              Positional lookups use a table of chunk offsets that is rebuilt
+#              (in time proportional to the number of chunks) only after the
+#              list has changed.
+#-------------------------------------------------------------------------------
+class SortedList:
+    #--------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Initializes the SortedList object.
+    #
+    #      Inputs: values       - Initial elements, in any order. ('None' by
+    #                             default.)
+    #              sortFunction - The sort function used to sort the initial
+    #                             elements ('timSort' by default).
+    #
+    #     Outputs: None.
+    #--------------------------------------------------------------------------
+    def __init__(self, values=None, sortFunction=None):
+        self.chunks = []
+        self.maximums = []
+        self.length = 0
+        self.offsets = None
+        if values is not None:
+            self.bulkLoad(values, sortFunction)
+
+    #--------------------------------------------------------------------------
+    #      Method: bulkLoad
+    #
+    # Description: Adds many elements at once: the new elements are sorted via
+    #              a given sort function, merged with the existing elements,
+    #              and divided into chunks. Much faster than adding each
+    #              element individually.
+    #
+    #      Inputs: values       - The elements to be added, in any order.
+    #              sortFunction - The sort function to be used ('timSort' by
+    #                             default).
+    #
+    #     Outputs: A tuple containing the number of element comparisons and the
+    #              number of element swaps performed by the sort function.
+    #--------------------------------------------------------------------------
+    def bulkLoad(self, values, sortFunction=None):
+        if sortFunction is None:
+            sortFunction = timSort
+
+        values = [value for value in values]
+        (comparisons, swaps) = sortFunction(values)
+        if self.length:
+            values = [value for value in heapq.merge(iter(self), values)]
+
+        self.chunks = [values[i:i + SORTED_LIST_CHUNK_SIZE]
+                       for i in range(0, len(values), SORTED_LIST_CHUNK_SIZE)]
+        self.maximums = [chunk[-1] for chunk in self.chunks]
+        self.length = len(values)
+        self.offsets = None
+
+        return (comparisons, swaps)
+
+    #--------------------------------------------------------------------------
+    #      Method: add
+    #
+    # Description: Adds an element, after any equal elements.
+    #
+    #      Inputs: value - The element to be added.
+    #
+    #     Outputs: None.
+    #--------------------------------------------------------------------------
+    def add(self, value):
+        self.length += 1
+        self.offsets = None
+        if not self.chunks:
+            self.chunks.append([value])
+            self.maximums.append(value)
+            return
+
+        i = bisect.bisect_right(self.maximums, value)
+        if i == len(self.chunks):
+            i -= 1
+            self.chunks[i].append(value)
+            self.maximums[i] = value
+        else:
+            bisect.insort_right(self.chunks[i], value)
+
+        # Split the chunk in two if it has grown too long:
+        chunk = self.chunks[i]
+        if len(chunk) > 2 * SORTED_LIST_CHUNK_SIZE:
+            self.chunks.insert(i + 1, chunk[SORTED_LIST_CHUNK_SIZE:])
+            del chunk[SORTED_LIST_CHUNK_SIZE:]
+            self.maximums.insert(i, chunk[-1])
+
+    #--------------------------------------------------------------------------
+    #      Method: remove
+    #
+    # Description: Removes one occurrence of an element.
+    #
+    #      Inputs: value - The element to be removed.
+    #
+    #     Outputs: None. (Raises a ValueError if the element is not present.)
+    #--------------------------------------------------------------------------
+    def remove(self, value):
+        (i, j) = self.locate(value)
+        if i is None:
+            raise ValueError('SortedList.remove(x): x not in list')
+
+        chunk = self.chunks[i]
+        del chunk[j]
+        self.length -= 1
+        self.offsets = None
+        if chunk:
+            self.maximums[i] = chunk[-1]
+        else:
+            del self.chunks[i]
+            del self.maximums[i]
+
+    #--------------------------------------------------------------------------
+    #      Method: locate
+    #
+    # Description: Finds the first occurrence of an element.
+    #
+    #      Inputs: value - The element to be found.
+    #
+    #     Outputs: A tuple containing the index of the chunk containing the
+    #              element and the element's index within that chunk, or
+    #              (None, None) if the element is not present.
+    #--------------------------------------------------------------------------
+    def locate(self, value):
+        i = bisect.bisect_left(self.maximums, value)
+        if i == len(self.chunks):
+            return (None, None)
+        j = bisect.bisect_left(self.chunks[i], value)
+        if self.chunks[i][j] != value:
+            return (None, None)
+
+        return (i, j)
+
+    #--------------------------------------------------------------------------
+    #      Method: rank
+    #
+    # Description: Counts the elements less than (or, optionally, less than or
+    #              equal to) a given value; i.e., finds the index at which the
+    #              value would be inserted.
+    #
+    #      Inputs: value     - The value to be ranked.
+    #              inclusive - If 'True', elements equal to the value are also
+    #                          counted. ('False' by default.)
+    #
+    #     Outputs: The number of elements less than (or equal to) 'value'.
+    #--------------------------------------------------------------------------
+    def rank(self, value, inclusive=False):
+        if inclusive:
+            search = bisect.bisect_right
+        else:
+            search = bisect.bisect_left
+
+        i = search(self.maximums, value)
+        if i == len(self.chunks):
+            return self.length
+
+        return self.getOffsets()[i] + search(self.chunks[i], value)
+
+    #--------------------------------------------------------------------------
+    #      Method: countRange
+    #
+    # Description: Counts the elements within a given range of values.
+    #
+    #      Inputs: minimum - Lower bound of the range (inclusive).
+    #              maximum - Upper bound of the range (inclusive).
+    #
+    #     Outputs: The number of elements between 'minimum' and 'maximum'.
+    #--------------------------------------------------------------------------
+    def countRange(self, minimum, maximum):
+        return max(0, self.rank(maximum, True) - self.rank(minimum))
+
+    #--------------------------------------------------------------------------
+    #      Method: irange
+    #
+    # Description: Iterates over the elements within a given range of values,
+    #              in ascending order.
+    #
+    #      Inputs: minimum - Lower bound of the range (inclusive).
+    #              maximum - Upper bound of the range (inclusive).
+    #
+    #     Outputs: A generator of the elements between 'minimum' and 'maximum'.
+    #--------------------------------------------------------------------------
+    def irange(self, minimum, maximum):
+        i = bisect.bisect_left(self.maximums, minimum)
+        if i == len(self.chunks):
+            return
+        j = bisect.bisect_left(self.chunks[i], minimum)
+        while i < len(self.chunks):
+            chunk = self.chunks[i]
+            while j < len(chunk):
+                if maximum < chunk[j]:
+                    return
+                yield chunk[j]
+                j += 1
+            i += 1
+            j = 0
+
+    #--------------------------------------------------------------------------
+    #      Method: getOffsets
+    #
+    # Description: Gets the index of the first element of each chunk within
+    #              the list as a whole, rebuilding the table if the list has
+    #              changed.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: A list of offsets, one per chunk.
+    #--------------------------------------------------------------------------
+    def getOffsets(self):
+        if self.offsets is None:
+            self.offsets = []
+            total = 0
+            for chunk in self.chunks:
+                self.offsets.append(total)
+                total += len(chunk)
+
+        return self.offsets
+
+    #--------------------------------------------------------------------------
+    #      Method: __getitem__
+    #
+    # Description: Gets the element at a given index (in ascending order).
+    #
+    #      Inputs: index - The index of the desired element (negative indices
+    #                      count from the end).
+    #
+    #     Outputs: The element at 'index'.
+    #--------------------------------------------------------------------------
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError('SortedList index out of range')
+
+        offsets = self.getOffsets()
+        i = bisect.bisect_right(offsets, index) - 1
+
+        return self.chunks[i][index - offsets[i]]
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self.chunks)
+
+    def __contains__(self, value):
+        return self.locate(value)[0] is not None
+
+    def __repr__(self):
+        return 'SortedList(' + repr([value for value in self]) + ')'
+
+#-------------------------------------------------------------------------------
+#    Function: createRandomList
+#
+# Description: Creates a list of a given length whose elements are integers
+#              randomly selected between 0 and the length of the list
+#              (exclusive). Duplicate elements may occur and the list will not
+#              be sorted.
+#
+#      Inputs: n - The length of the list as well as one more than the maximum
+#                  value of its elements.
+#
+#     Outputs: A random list of 'n' integers between 0 and 'n' (exclusive).
+#-------------------------------------------------------------------------------
+def createRandomList(n):
+    return createRandomIntegers(n, n)
+
+#-------------------------------------------------------------------------------
+#    Function: createRandomIntegers
+#
+# Description: Creates a list of integers randomly selected between 0 and a
+#              given upper bound (exclusive). Large lists are generated via
+#              NumPy, if available, seeded from Python's 'random' module so
+#              that 'random.seed' still determines the result. Otherwise each
+#              value is computed exactly as 'random.randint' would compute it,
+#              minus the overhead of calling it.
+#
+#      Inputs: n          - The length of the list.
+#              upperBound - One more than the maximum value of the elements.
+#
+#     Outputs: A random list of 'n' integers between 0 and 'upperBound'
+#              (exclusive).
+#-------------------------------------------------------------------------------
+def createRandomIntegers(n, upperBound):
+    if numpy and n >= VECTORIZE_THRESHOLD:
+        generator = numpy.random.RandomState(random.getrandbits(32))
+        return generator.randint(0, upperBound, n).tolist()
+
+    randomFloat = random.random
+    return [int(randomFloat() * upperBound) for i in xrange(n)]
 
 #-------------------------------------------------------------------------------
 #    Function: createMostlySortedList
@@ -337,22 +2861,202 @@ def createRandomList(n):
 #              (exclusive; duplicate elements may occur), sorts the list, then
 #              swaps the first and last elements.
 #
-#      Inputs: n - The length of the list as well as one more than the maximum
-#                  value of its elements.
+#      Inputs: n - The length of the list as well as one more than the maximum
+#                  value of its elements.
+#
+#     Outputs: A mostly sorted list of 'n' randomly generated integers between 0
+#              and 'n' (exclusive).
+#-------------------------------------------------------------------------------
+def createMostlySortedList(n):
+    list = createRandomList(n)
+    list.sort()
+    list[0], list[n - 1] = list[n - 1], list[0]
+
+    return list
+
+#-------------------------------------------------------------------------------
+#    Function: createReversedList
+#
+# Description: Creates a list of a given length whose elements are integers
+#              randomly selected between 0 and the length of the list
+#              (exclusive; duplicate elements may occur), sorted in descending
+#              order.
+#
+#      Inputs: n - The length of the list as well as one more than the maximum
+#                  value of its elements.
+#
+#     Outputs: A reverse-sorted list of 'n' randomly generated integers between
+#              0 and 'n' (exclusive).
+#-------------------------------------------------------------------------------
+def createReversedList(n):
+    list = createRandomList(n)
+    list.sort(reverse=True)
+
+    return list
+
+#-------------------------------------------------------------------------------
+#    Function: createFewUniqueList
+#
+# Description: Creates a list of a given length whose elements are integers
+#              randomly selected from a small number of distinct values.
+#
+#      Inputs: n      - The length of the list.
+#              unique - The number of distinct values, from 0 to 'unique'
+#                       (exclusive). ('FEW_UNIQUE_VALUES' by default.)
+#
+#     Outputs: A random list of 'n' integers between 0 and 'unique'
+#              (exclusive).
+#-------------------------------------------------------------------------------
+def createFewUniqueList(n, unique=None):
+    if unique is None:
+        unique = FEW_UNIQUE_VALUES
+
+    return createRandomIntegers(n, unique)
+
+#-------------------------------------------------------------------------------
+#    Function: createSortedList
+#
+# Description: Creates a list of a given length whose elements are integers
+#              randomly selected between 0 and the length of the list
+#              (exclusive; duplicate elements may occur), sorted in ascending
+#              order.
+#
+#      Inputs: n - The length of the list as well as one more than the maximum
+#                  value of its elements.
+#
+#     Outputs: A sorted list of 'n' randomly generated integers between 0 and
+#              'n' (exclusive).
+#-------------------------------------------------------------------------------
+def createSortedList(n):
+    list = createRandomList(n)
+    list.sort()
+
+    return list
+
+#-------------------------------------------------------------------------------
+#    Function: createOrganPipeList
+#
+# Description: Creates an "organ pipe" list of a given length: the integers
+#              from 0 up to (roughly) n / 2 in ascending order, followed by the
+#              same values in descending order.
+#
+#      Inputs: n - The length of the list.
+#
+#     Outputs: A list of 'n' integers that rises, then falls.
+#-------------------------------------------------------------------------------
+def createOrganPipeList(n):
+    return range(n - n / 2) + range(n / 2 - 1, -1, -1)
+
+#-------------------------------------------------------------------------------
+#    Function: createSawtoothList
+#
+# Description: Creates a "sawtooth" list of a given length: 'SAWTOOTH_TEETH'
+#              ascending runs of (roughly) equal length, each starting over from
+#              zero.
+#
+#      Inputs: n - The length of the list.
+#
+#     Outputs: A list of 'n' integers consisting of several ascending runs.
+#-------------------------------------------------------------------------------
+def createSawtoothList(n):
+    period = max(1, -(-n / SAWTOOTH_TEETH))
+
+    return [i % period for i in xrange(n)]
+
+#-------------------------------------------------------------------------------
+#    Function: createZipfList
+#
+# Description: Creates a list of a given length whose elements are integers
+#              between 0 and the length of the list (exclusive), selected at
+#              random according to Zipf's law: the probability of value 'k' is
+#              proportional to 1 / (k + 1)^s, where 's' is 'ZIPF_EXPONENT'. Low
+#              values are thus heavily duplicated.
+#
+#      Inputs: n - The length of the list as well as one more than the maximum
+#                  value of its elements.
+#
+#     Outputs: A random list of 'n' integers between 0 and 'n' (exclusive).
+#-------------------------------------------------------------------------------
+def createZipfList(n):
+    if numpy and n >= VECTORIZE_THRESHOLD:
+        generator = numpy.random.RandomState(random.getrandbits(32))
+        cumulativeWeights = numpy.cumsum(
+            numpy.arange(1, n + 1, dtype=float) ** -ZIPF_EXPONENT)
+        samples = generator.random_sample(n) * cumulativeWeights[-1]
+        return numpy.searchsorted(cumulativeWeights, samples).tolist()
+
+    cumulativeWeights = []
+    total = 0.0
+    for k in xrange(1, n + 1):
+        total += k ** -ZIPF_EXPONENT
+        cumulativeWeights.append(total)
+    randomFloat = random.random
+
+    return [bisect.bisect_left(cumulativeWeights, randomFloat() * total)
+            for i in xrange(n)]
+
+#-------------------------------------------------------------------------------
+#    Function: createKSortedList
+#
+# Description: Creates a "k-sorted" list of a given length: a sorted list of
+#              random integers in which each element has been displaced by at
+#              most 'k' positions.
+#
+#      Inputs: n - The length of the list as well as one more than the maximum
+#                  value of its elements.
+#              k - The maximum displacement of any element ('K_SORTED_DISTANCE'
+#                  by default).
+#
+#     Outputs: A k-sorted list of 'n' randomly generated integers between 0 and
+#              'n' (exclusive).
+#-------------------------------------------------------------------------------
+def createKSortedList(n, k=None):
+    if k is None:
+        k = K_SORTED_DISTANCE
+
+    # Each element is sorted by its position plus a random offset of up to 'k',
+    # so it can only be passed by elements within 'k' positions of it:
+    list = createSortedList(n)
+    randomFloat = random.random
+    offsets = [i + randomFloat() * k for i in xrange(n)]
+
+    return [value for (offset, value) in sorted(zip(offsets, list))]
+
+#-------------------------------------------------------------------------------
+#    Function: registerDistribution
+#
+# Description: Adds an input distribution to the catalog of distributions
+#              available to the performance sweeps and benchmarks.
 #
-#     Outputs: A mostly sorted list of 'n' randomly generated integers between 0
-#              and 'n' (exclusive).
+#      Inputs: name      - Name by which the distribution will be selected.
+#              generator - A function of one argument, 'n', that returns a new
+#                          list of length 'n'.
+#              label     - Human-readable name used in reports (the same as
+#                          'name' by default).
+#
+#     Outputs: None. However, the distribution is added to the DISTRIBUTIONS
+#              dictionary.
 #-------------------------------------------------------------------------------
-def createMostlySortedList(n):
-    list = createRandomList(n)
-    list[0], list[n - 1] = list[n - 1], list[0]
+def registerDistribution(name, generator, label=None):
+    if label is None:
+        label = name
+    DISTRIBUTIONS[name] = (generator, label)
 
-    return list
+registerDistribution('random', createRandomList, 'Random')
+registerDistribution('mostlySorted', createMostlySortedList, 'Mostly Sorted')
+registerDistribution('sorted', createSortedList, 'Sorted')
+registerDistribution('reversed', createReversedList, 'Reversed')
+registerDistribution('organPipe', createOrganPipeList, 'Organ Pipe')
+registerDistribution('sawtooth', createSawtoothList, 'Sawtooth')
+registerDistribution('fewUnique', createFewUniqueList, 'Few Unique')
+registerDistribution('zipf', createZipfList, 'Zipf')
+registerDistribution('kSorted', createKSortedList, 'K-Sorted')
 
 #-------------------------------------------------------------------------------
 #    Function: isSorted
 #
 # Description: Determines whether a given list is sorted (in ascending order).
+#              Large numeric lists are checked via NumPy, if available.
 #
 #      Inputs: list - The list to be analyzed.
 #
@@ -360,17 +3064,19 @@ def createMostlySortedList(n):
 #              'False' otherwise.
 #-------------------------------------------------------------------------------
 def isSorted(list):
-    for i in range(len(list) - 1):
-        if list[i] > list[i + 1]:
-            return False
+    array = toNumericArray(list)
+    if array is not None:
+        return not (array[:-1] > array[1:]).any()
 
-    return True
+    return not any(itertools.imap(operator.gt, list,
+                                  itertools.islice(list, 1, None)))
 
 #-------------------------------------------------------------------------------
 #    Function: compareLists
 #
 # Description: Compares two lists of equal length, returning the number of
-#              differences between them.
+#              differences between them. Large numeric lists are compared via
+#              NumPy, if available.
 #
 #      Inputs: list1, list2 - The lists to be compared.
 #
@@ -382,12 +3088,62 @@ def compareLists(list1, list2):
         print "Error: lists of unequal length passed to 'compareLists()'."
         return -1
 
-    differences = 0
-    for i in range(len(list1)):
-        if list1[i] != list2[i]:
-            differences += 1
+    array1 = toNumericArray(list1)
+    array2 = toNumericArray(list2)
+    if array1 is not None and array2 is not None:
+        return int(numpy.count_nonzero(array1 != array2))
+
+    return sum(itertools.imap(operator.ne, list1, list2))
+
+#-------------------------------------------------------------------------------
+#    Function: isPermutation
+#
+# Description: Determines whether two lists contain the same elements, in any
+#              order (e.g., whether a sorted list still contains exactly the
+#              elements of the original list). Large numeric lists are checked
+#              via NumPy, if available.
+#
+#      Inputs: list1, list2 - The lists to be compared.
+#
+#     Outputs: 'True' if each list is a permutation of the other, 'False'
+#              otherwise.
+#-------------------------------------------------------------------------------
+def isPermutation(list1, list2):
+    if len(list1) != len(list2):
+        return False
+
+    array1 = toNumericArray(list1)
+    array2 = toNumericArray(list2)
+    if array1 is not None and array2 is not None:
+        return bool(numpy.array_equal(numpy.sort(array1), numpy.sort(array2)))
+
+    return sorted(list1) == sorted(list2)
+
+#-------------------------------------------------------------------------------
+#    Function: toNumericArray
+#
+# Description: Converts a list of numbers to a NumPy array, for vectorized
+#              verification of large lists.
+#
+#      Inputs: list - The list to be converted.
+#
+#     Outputs: A one-dimensional NumPy array of integers or floats, or 'None' if
+#              NumPy is unavailable, the list is shorter than
+#              'VECTORIZE_THRESHOLD', or its elements are not all numbers that
+#              fit in a native numeric type.
+#-------------------------------------------------------------------------------
+def toNumericArray(list):
+    if not numpy or len(list) < VECTORIZE_THRESHOLD:
+        return None
+
+    try:
+        array = numpy.asarray(list)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    if array.ndim != 1 or array.dtype.kind not in 'biuf':
+        return None
 
-    return differences
+    return array
 
 #-------------------------------------------------------------------------------
 #    Function: testSortFunction
@@ -412,9 +3168,7 @@ def testSortFunction(sortFunction, list, showLists=False):
           str(len(list)) + ':'
 
     # Copy original list (to compare with sorted list later):
-    listCopy = []
-    for e in list:
-        listCopy.append(e)
+    listCopy = list[:]
 
     # Sort list and display data regarding sort effectiveness and efficiency:
     (comparisons, swaps) = sortFunction(list)
@@ -422,6 +3176,7 @@ def testSortFunction(sortFunction, list, showLists=False):
     print '\tSwaps:\t\t' + str(swaps)
     print '\tDifferences:\t' + str(compareLists(list, listCopy))
     print '\tSorted:\t\t' + str(isSorted(list))
+    print '\tPermutation:\t' + str(isPermutation(list, listCopy))
     if showLists:
         print '\tOriginal list:\t' + str(listCopy)
         print '\tSorted list:\t' + str(list)
@@ -445,7 +3200,8 @@ def testSortFunction(sortFunction, list, showLists=False):
 #                             ('False' by default.)
 #
 #     Outputs: A list containing the number of times each sort function failed
-#              (with indices corresponding to those of the list of functions).
+#              to produce a sorted permutation of the original list (with
+#              indices corresponding to those of the list of functions).
 #-------------------------------------------------------------------------------
 def testMultipleSortFunctions(functionList, testListSize=1000, iterations=1000,
                               mostlySorted=False):
@@ -458,109 +3214,1371 @@ def testMultipleSortFunctions(functionList, testListSize=1000, iterations=1000,
                 list = createMostlySortedList(testListSize)
             else:
                 list = createRandomList(testListSize)
+            original = list[:]
             functionList[i](list)
-            if not isSorted(list):
+            if not isSorted(list) or not isPermutation(list, original):
                 failuresList[i] += 1
 
     return failuresList
 
+#-------------------------------------------------------------------------------
+#    Function: runPerformanceTest
+#
+# Description: Sorts a single freshly generated list as one cell of the sweep
+#              performed by 'storePerformanceDataForMultipleSortFunctions'.
+#              Defined at module level so that it may be run in a process pool.
+#
+#      Inputs: test - A tuple containing the sort function to be tested, the
+#                     size of the list to be sorted, the name of a registered
+#                     input distribution, and a seed for the random number
+#                     generator (or 'None' to leave it unseeded).
+#
+#     Outputs: A tuple containing the number of element comparisons and the
+#              number of element swaps that occurred.
+#-------------------------------------------------------------------------------
+def runPerformanceTest(test):
+    (sortFunction, listSize, distribution, seed) = test
+
+    if seed is not None:
+        random.seed(seed)
+    testList = DISTRIBUTIONS[distribution][0](listSize)
+
+    return sortFunction(testList)
+
+#-------------------------------------------------------------------------------
+#    Function: deriveSeed
+#
+# Description: Derives a deterministic seed for one cell of a performance sweep
+#              from a base seed and the cell's coordinates, so that each cell
+#              generates the same data no matter which process runs it.
+#
+#      Inputs: seed        - The base seed.
+#              coordinates - Integers identifying the cell.
+#
+#     Outputs: An integer seed.
+#-------------------------------------------------------------------------------
+def deriveSeed(seed, *coordinates):
+    return int(hashlib.md5(repr((seed,) + coordinates)).hexdigest(), 16)
+
 #-------------------------------------------------------------------------------
 #    Function: storePerformanceDataForMultipleSortFunctions
 #
 # Description: Collects performance data for a given list of sort functions and
-#              stores the results in a CSV (comma-separated values) file.
+#              stores the results in a CSV (comma-separated values) file. Each
+#              (function, list size, data type, iteration) cell may be run in a
+#              process pool; results are merged in order, so a parallel run
+#              writes exactly the same file as a serial run with the same seed.
 #
 #      Inputs: filename     - Desired name for the output file.
 #              functionList - A list of tuples, each containing a sort function
-#                             followed by its name as a string.
+#                             followed by its name as a string. (For parallel
+#                             runs, the functions must be defined at module
+#                             level so they can be pickled.)
 #              iterations   - Number of times to run each test for each
 #                             function (1000 by default).
+#              seed         - If given, each cell seeds the random number
+#                             generator with a seed derived from this value
+#                             and the cell's coordinates, making the results
+#                             reproducible. ('None' by default, unless running
+#                             in parallel, where a random seed is chosen so
+#                             that processes don't share generator state.)
+#              processes    - Number of worker processes to use, or 'None' to
+#                             use one per CPU core. (1 by default, meaning the
+#                             tests are run serially in this process.)
+#              distributions - Names of the registered input distributions to
+#                             test, each in its own pair of sections
+#                             (['random', 'mostlySorted'] by default).
+#              powersOfTwo  - The powers of two giving the list sizes to test
+#                             (3 through 12 by default).
 #
 #     Outputs: The number of tests performed, or -1 if an error occurs. (Also,
 #              data is written to an output file.)
 #-------------------------------------------------------------------------------
 def storePerformanceDataForMultipleSortFunctions(filename, functionList,
-                                                 iterations=1000):
+                                                 iterations=1000, seed=None,
+                                                 processes=1,
+                                                 distributions=None,
+                                                 powersOfTwo=None):
     totalTests = 0
     storeComparisons = True
-    mostlySorted = False
+    distributionIndex = 0
     done = False
+    section = 0
+
+    if distributions is None:
+        distributions = ['random', 'mostlySorted']
+    if powersOfTwo is None:
+        powersOfTwo = range(3, 13)
 
     fout = open(filename, 'w')
     if not fout:
         print 'Error: the file "' + filename + '" could not be opened.'
         return -1
 
+    pool = None
+    if processes != 1:
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        pool = multiprocessing.Pool(processes)
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+
     while not done:
         if storeComparisons:
             s = 'Comparisons'
         else:
             s = 'Swaps'
-        if mostlySorted:
-            s += ' on Mostly Sorted Data\n'
-        else:
-            s += ' on Random Data\n'
+        distribution = distributions[distributionIndex]
+        s += ' on ' + DISTRIBUTIONS[distribution][1] + ' Data\n'
 
         fout.write(s)
         print s
 
+        # Gather performance data for every cell of this section:
+        tests = []
+        for powerOfTwo in powersOfTwo:
+            for f in range(len(functionList)):
+                for i in range(iterations):
+                    if seed is None:
+                        testSeed = None
+                    else:
+                        testSeed = deriveSeed(seed, section, powerOfTwo, f, i)
+                    tests.append((functionList[f][0], 2 ** powerOfTwo,
+                                  distribution, testSeed))
+        if pool:
+            chunkSize = max(1, len(tests) / (processes * 4))
+            testResults = pool.map(runPerformanceTest, tests, chunkSize)
+        else:
+            testResults = map(runPerformanceTest, tests)
+        totalTests += len(tests)
+
         # Write column headers to the file:
         fout.write('Power of Two, ')
         for function in functionList:
             fout.write(function[1] + ', ')
         fout.write('\n')
 
-        # Gather performance data and write them to the file:
-        for powerOfTwo in range(3, 13):
-            listSize = 2 ** powerOfTwo
+        # Write performance data to the file:
+        j = 0
+        for powerOfTwo in powersOfTwo:
             print '2^' + str(powerOfTwo)
             fout.write(str(powerOfTwo) + ', ')
             for function in functionList:
                 print function[1]
                 totalComparisons, totalSwaps = 0, 0
                 for i in range(iterations):
-                    if mostlySorted:
-                        testList = createMostlySortedList(listSize)
-                    else:
-                        testList = createRandomList(listSize)
-                    (comparisons, swaps) = function[0](testList)
+                    (comparisons, swaps) = testResults[j]
                     totalComparisons += comparisons
                     totalSwaps += swaps
-                    totalTests += 1
+                    j += 1
                 if storeComparisons:
-                    s = str(math.log(float(totalComparisons / iterations), 2))
+                    average = totalComparisons / iterations
+                else:
+                    average = totalSwaps / iterations
+                if average > 0:
+                    s = str(math.log(float(average), 2))
                 else:
-                    s = str(math.log(float(totalSwaps / iterations), 2))
+                    s = str(float('-inf'))
                 fout.write(s + ', ')
             fout.write('\n')
 
         # Change settings for next test run:
         if storeComparisons:
             storeComparisons = False
-        elif mostlySorted:
+        elif distributionIndex == len(distributions) - 1:
             done = True
         else:
-            mostlySorted     = True
-            storeComparisons = True
+            distributionIndex += 1
+            storeComparisons  = True
+        section += 1
         fout.write('\n')
 
+    if pool:
+        pool.close()
+        pool.join()
     fout.close()
 
     return totalTests
 
+#-------------------------------------------------------------------------------
+#       Class: CounterRemover
+#
+# Description: Removes the statements that update comparison and swap counters
+#              (i.e., augmented assignments to any of the names in
+#              UNINSTRUMENTED_COUNTERS) from a function's syntax tree.
+#-------------------------------------------------------------------------------
+class CounterRemover(ast.NodeTransformer):
+    def visit_AugAssign(self, node):
+        if isinstance(node.target, ast.Name) and \
+           node.target.id in UNINSTRUMENTED_COUNTERS:
+            return None
+        return node
+
+    def generic_visit(self, node):
+        ast.NodeTransformer.generic_visit(self, node)
+
+        # A block left empty must still contain a statement:
+        if 'body' in node._fields and node.body == []:
+            node.body = [ast.Pass()]
+
+        return node
+
+#-------------------------------------------------------------------------------
+#    Function: createUninstrumentedFunctions
+#
+# Description: Recompiles the functions of this module with their counter
+#              bookkeeping removed (via 'CounterRemover'), so that timings
+#              measure the algorithms alone. The recompiled functions live in a
+#              copy of the module's namespace, so they call one another rather
+#              than their instrumented counterparts. Functions listed in
+#              INSTRUMENTED_FUNCTIONS, and those declaring global variables
+#              (whose state must remain shared with this module), are left
+#              unchanged. Functions that use a process pool, directly or
+#              through another function, are left out entirely: the functions
+#              they send to worker processes must be picklable, which the
+#              recompiled functions are not.
+#
+#      Inputs: None.
+#
+#     Outputs: A dictionary mapping names to the module's objects, with the
+#              recompiled functions in place of the originals. If the module's
+#              source code is unavailable, or a 'SortTracer' is running, a
+#              ValueError is raised.
+#-------------------------------------------------------------------------------
+def createUninstrumentedFunctions():
+    namespace = dict(globals())
+    trees = {}
+    for (name, value) in globals().items():
+        if not inspect.isfunction(value) or value.__module__ != __name__ or \
+           name in INSTRUMENTED_FUNCTIONS:
+            continue
+        if value.__code__.co_name != name:
+            raise ValueError('Fast mode is unavailable while a SortTracer is '
+                             'running')
+        try:
+            (source, lineNumber) = inspect.getsourcelines(value)
+        except (IOError, TypeError):
+            raise ValueError('Fast mode requires the source code of ' +
+                             __name__ + ', which is unavailable')
+        tree = ast.parse(textwrap.dedent(''.join(source)))
+        if any(isinstance(node, ast.Global) for node in ast.walk(tree)):
+            continue
+        trees[name] = (tree, lineNumber, inspect.getsourcefile(value))
+
+    # Find the functions that use a process pool, directly or indirectly:
+    names = dict((name, set(node.id for node in ast.walk(trees[name][0])
+                            if isinstance(node, ast.Name)))
+                 for name in trees)
+    poolUsers = set(name for name in trees
+                    if 'multiprocessing' in names[name])
+    while True:
+        callers = set(name for name in trees
+                      if name not in poolUsers and names[name] & poolUsers)
+        if not callers:
+            break
+        poolUsers |= callers
+    for name in poolUsers:
+        del namespace[name]
+
+    for name in trees:
+        if name in poolUsers:
+            continue
+        (tree, lineNumber, filename) = trees[name]
+        tree = CounterRemover().visit(tree)
+        ast.increment_lineno(tree, lineNumber - 1)
+        code = compile(ast.fix_missing_locations(tree), filename, 'exec')
+        exec code in namespace
+
+    return namespace
+
+#-------------------------------------------------------------------------------
+#    Function: uninstrumented
+#
+# Description: Gets the "fast mode" version of a sort function from this
+#              module: one from which all counter bookkeeping has been removed
+#              (see 'createUninstrumentedFunctions'). It sorts exactly as the
+#              original does, but the comparison and swap counts it returns are
+#              meaningless (usually zero). The fast versions are created the
+#              first time this function is called, and are never traced by a
+#              'SortTracer'.
+#
+#      Inputs: sortFunction - A sort function defined in this module.
+#
+#     Outputs: The uninstrumented version of 'sortFunction'. A ValueError is
+#              raised if there is none (e.g., for 'parallelSort', or any other
+#              function that uses a process pool).
+#-------------------------------------------------------------------------------
+def uninstrumented(sortFunction):
+    name = getattr(sortFunction, '__name__', None)
+    if globals().get(name) is not sortFunction:
+        raise ValueError('Not a sort function of this module: ' +
+                         repr(sortFunction))
+    if not UNINSTRUMENTED_FUNCTIONS:
+        UNINSTRUMENTED_FUNCTIONS.update(createUninstrumentedFunctions())
+    if name not in UNINSTRUMENTED_FUNCTIONS:
+        raise ValueError(name + ' uses a process pool, so it has no '
+                         'uninstrumented version')
+
+    return UNINSTRUMENTED_FUNCTIONS[name]
+
+#-------------------------------------------------------------------------------
+#       Class: SortTracer
+#
+# Description: Records a timestamped event for each call made during a sort to
+#              one of the helper functions named in TRACE_PHASES (partitions,
+#              recursive calls, merges, passes, buffer copies, and so on), so
+#              that the time spent in each phase of an algorithm can be seen.
+#              Tracing is opt-in and costs nothing when unused: while a tracer
+#              is running, those helpers are temporarily replaced, within this
+#              module, by wrappers that record their calls (which slows them
+#              somewhat). Events can be summarized per algorithm or exported as
+#              collapsed stacks (for flame graphs) or as Chrome trace JSON
+#              (for 'chrome://tracing' and similar viewers).
+#
+#              Each event is a list containing the function's name, its phase,
+#              its start and end times (in seconds), its depth (zero for the
+#              outermost call), the index of its parent event (or 'None'), and
+#              the name of the sort function being traced (or of the outermost
+#              function, outside of any sort function).
+#-------------------------------------------------------------------------------
+class SortTracer:
+    #--------------------------------------------------------------------------
+    #      Method: __init__
+    #
+    # Description: Initializes the SortTracer object.
+    #
+    #      Inputs: phases - A dictionary mapping the names of this module's
+    #                       functions to the phases they represent
+    #                       (TRACE_PHASES by default).
+    #
+    #     Outputs: None.
+    #--------------------------------------------------------------------------
+    def __init__(self, phases=None):
+        if phases is None:
+            phases = TRACE_PHASES
+        self.phases = phases
+        self.events = []
+        self.stack = []
+        self.originals = {}
+        self.startTime = timeit.default_timer()
+
+    #--------------------------------------------------------------------------
+    #      Method: start
+    #
+    # Description: Starts recording calls to the traced helper functions by
+    #              replacing them with wrappers.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #--------------------------------------------------------------------------
+    def start(self):
+        if self.originals:
+            return
+        namespace = globals()
+        for (name, phase) in self.phases.items():
+            if name in namespace:
+                self.originals[name] = namespace[name]
+                namespace[name] = self.wrap(namespace[name], phase)
+
+    #--------------------------------------------------------------------------
+    #      Method: stop
+    #
+    # Description: Stops recording, restoring the original helper functions.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: None.
+    #--------------------------------------------------------------------------
+    def stop(self):
+        globals().update(self.originals)
+        self.originals = {}
+
+    #--------------------------------------------------------------------------
+    #      Method: wrap
+    #
+    # Description: Creates a wrapper that records an event for each call to a
+    #              given function.
+    #
+    #      Inputs: function - The function to be wrapped.
+    #              phase    - The phase the function represents ('sort' by
+    #                         default).
+    #
+    #     Outputs: The wrapper function.
+    #--------------------------------------------------------------------------
+    def wrap(self, function, phase='sort'):
+        name = function.__name__
+
+        def traced(*arguments, **keywords):
+            if self.stack:
+                parent = self.stack[-1]
+            else:
+                parent = None
+            if phase == 'sort' or parent is None:
+                algorithm = name
+            else:
+                algorithm = self.events[parent][6]
+            index = len(self.events)
+            event = [name, phase, timeit.default_timer(), None,
+                     len(self.stack), parent, algorithm]
+            self.events.append(event)
+            self.stack.append(index)
+            try:
+                return function(*arguments, **keywords)
+            finally:
+                event[3] = timeit.default_timer()
+                self.stack.pop()
+
+        traced.__name__ = name
+        return traced
+
+    #--------------------------------------------------------------------------
+    #      Method: trace
+    #
+    # Description: Sorts a list via a given sort function while recording
+    #              events. May be called repeatedly to accumulate events.
+    #
+    #      Inputs: sortFunction - The sort function to be traced.
+    #              list         - The list to be sorted.
+    #
+    #     Outputs: The result of the sort function (usually a tuple containing
+    #              the number of element comparisons and swaps).
+    #--------------------------------------------------------------------------
+    def trace(self, sortFunction, list):
+        self.start()
+        try:
+            return self.wrap(sortFunction)(list)
+        finally:
+            self.stop()
+
+    #--------------------------------------------------------------------------
+    #      Method: getSelfTimes
+    #
+    # Description: Calculates the time spent in each event excluding the time
+    #              spent in its child events.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: A list of times (in seconds), one per event.
+    #--------------------------------------------------------------------------
+    def getSelfTimes(self):
+        selfTimes = [event[3] - event[2] for event in self.events]
+        for event in self.events:
+            if event[5] is not None:
+                selfTimes[event[5]] -= event[3] - event[2]
+
+        return selfTimes
+
+    #--------------------------------------------------------------------------
+    #      Method: summarize
+    #
+    # Description: Aggregates the recorded events by algorithm and phase.
+    #
+    #      Inputs: None.
+    #
+    #     Outputs: A dictionary mapping the name of each traced sort function
+    #              to a dictionary mapping each phase to a dictionary
+    #              containing its number of 'calls', 'totalTime' (in seconds,
+    #              counting nested calls of the same phase once), 'selfTime'
+    #              (excluding all nested calls), and 'maxDepth'.
+    #--------------------------------------------------------------------------
+    def summarize(self):
+        summary = {}
+        selfTimes = self.getSelfTimes()
+        for (index, event) in enumerate(self.events):
+            (name, phase, start, end, depth, parent, algorithm) = event
+            phases = summary.setdefault(algorithm, {})
+            if phase not in phases:
+                phases[phase] = {'calls': 0, 'totalTime': 0.0,
+                                 'selfTime': 0.0, 'maxDepth': 0}
+            totals = phases[phase]
+            totals['calls'] += 1
+            totals['selfTime'] += selfTimes[index]
+            totals['maxDepth'] = max(totals['maxDepth'], depth)
+
+            # Count only the outermost of any nested calls of the same phase:
+            while parent is not None and self.events[parent][1] != phase:
+                parent = self.events[parent][5]
+            if parent is None:
+                totals['totalTime'] += end - start
+
+        return summary
+
+    #--------------------------------------------------------------------------
+    #      Method: writeCollapsedStacks
+    #
+    # Description: Writes the recorded events in the "collapsed stack" format
+    #              read by flame graph tools (e.g., 'flamegraph.pl'): one line
+    #              per distinct call stack, containing the function names from
+    #              the outermost call inward, separated by semicolons, followed
+    #              by the total time spent in that stack (excluding calls made
+    #              from it) in microseconds.
+    #
+    #      Inputs: filename - Desired name for the output file.
+    #
+    #     Outputs: None. However, data is written to an output file.
+    #--------------------------------------------------------------------------
+    def writeCollapsedStacks(self, filename):
+        selfTimes = self.getSelfTimes()
+        stacks = []
+        weights = {}
+        for (index, event) in enumerate(self.events):
+            if event[5] is None:
+                stacks.append(event[0])
+            else:
+                stacks.append(stacks[event[5]] + ';' + event[0])
+            weights[stacks[index]] = weights.get(stacks[index], 0.0) + \
+                                     selfTimes[index]
+
+        fout = open(filename, 'w')
+        for stack in sorted(weights):
+            microseconds = int(round(weights[stack] * 1e6))
+            if microseconds > 0:
+                fout.write(stack + ' ' + str(microseconds) + '\n')
+        fout.close()
+
+    #--------------------------------------------------------------------------
+    #      Method: writeChromeTrace
+    #
+    # Description: Writes the recorded events in the Chrome trace event format
+    #              (JSON), as one "complete" event per call, with timestamps in
+    #              microseconds since the tracer was created.
+    #
+    #      Inputs: filename - Desired name for the output file.
+    #
+    #     Outputs: None. However, data is written to an output file.
+    #--------------------------------------------------------------------------
+    def writeChromeTrace(self, filename):
+        processId = os.getpid()
+        traceEvents = []
+        for (name, phase, start, end, depth, parent, algorithm) \
+            in self.events:
+            traceEvents.append({'name': name,
+                                'cat':  phase,
+                                'ph':   'X',
+                                'ts':   (start - self.startTime) * 1e6,
+                                'dur':  (end - start) * 1e6,
+                                'pid':  processId,
+                                'tid':  0,
+                                'args': {'algorithm': algorithm,
+                                         'depth':     depth}})
+
+        fout = open(filename, 'w')
+        json.dump({'traceEvents': traceEvents, 'displayTimeUnit': 'ms'},
+                  fout)
+        fout.write('\n')
+        fout.close()
+
+#-------------------------------------------------------------------------------
+#    Function: measureSortFunction
+#
+# Description: Runs a sort function once on a given list and measures its wall
+#              time, CPU time, and peak memory allocated while it ran. Garbage
+#              collection is disabled during the run (as 'timeit' does). Peak
+#              memory is measured via 'tracemalloc' (which inflates the timings
+#              somewhat), so it is unavailable where that module is missing
+#              (e.g., Python 2.7): the process's peak resident set size is a
+#              lifetime high-water mark, so it cannot measure a single run.
+#
+#      Inputs: sortFunction - The sort function to be measured.
+#              list         - The list to be sorted.
+#              trackMemory  - If 'True', peak memory is measured. ('True' by
+#                             default.)
+#
+#     Outputs: A dictionary containing 'wallTime' and 'cpuTime' (in seconds),
+#              'peakMemory' (in bytes, or 'None' if not tracked or
+#              unavailable), and the 'comparisons' and 'swaps' reported by the
+#              sort function.
+#-------------------------------------------------------------------------------
+def measureSortFunction(sortFunction, list, trackMemory=True):
+    peakMemory = None
+    gcWasEnabled = gc.isenabled()
+    gc.disable()
+    trackMemory = trackMemory and tracemalloc is not None
+    if trackMemory:
+        tracemalloc.start()
+
+    startWallTime = timeit.default_timer()
+    startCpuTime = time.clock()
+    (comparisons, swaps) = sortFunction(list)
+    cpuTime = time.clock() - startCpuTime
+    wallTime = timeit.default_timer() - startWallTime
+
+    if trackMemory:
+        peakMemory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    if gcWasEnabled:
+        gc.enable()
+
+    return {'wallTime':    wallTime,
+            'cpuTime':     cpuTime,
+            'peakMemory':  peakMemory,
+            'comparisons': comparisons,
+            'swaps':       swaps}
+
+#-------------------------------------------------------------------------------
+#    Function: percentile
+#
+# Description: Calculates a given percentile of a list of numbers, linearly
+#              interpolating between the closest ranks.
+#
+#      Inputs: values - A non-empty list of numbers.
+#              p      - The desired percentile, between 0 and 100.
+#
+#     Outputs: The 'p'th percentile of 'values' (or 'None' if any value is
+#              'None').
+#-------------------------------------------------------------------------------
+def percentile(values, p):
+    if None in values:
+        return None
+
+    values = sorted(values)
+    rank = (len(values) - 1) * p / 100.0
+    low = int(math.floor(rank))
+    high = int(math.ceil(rank))
+
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+#-------------------------------------------------------------------------------
+#    Function: median
+#
+# Description: Calculates the median of a list of numbers.
+#
+#      Inputs: values - A non-empty list of numbers.
+#
+#     Outputs: The median of 'values' (or 'None' if any value is 'None').
+#-------------------------------------------------------------------------------
+def median(values):
+    return percentile(values, 50)
+
+#-------------------------------------------------------------------------------
+#    Function: benchmarkSortFunctions
+#
+# Description: Measures the wall time, CPU time, peak memory, comparisons, and
+#              swaps of each sort function in a given list over a range of list
+#              sizes. For each function and size, a number of untimed warmup
+#              runs are performed before the timed repetitions; each run sorts
+#              a freshly generated list.
+#
+#      Inputs: functionList - A list of tuples, each containing a sort function
+#                             followed by its name as a string.
+#              sizes        - A list of list sizes to test (powers of two from
+#                             2^3 to 2^12 by default).
+#              repetitions  - Number of timed runs per function and size (10 by
+#                             default).
+#              warmups      - Number of untimed runs per function and size
+#                             performed before the timed runs (2 by default).
+#              mostlySorted - If 'True', "mostly sorted" lists are used rather
+#                             than completely random lists. ('False' by
+#                             default.)
+#              trackMemory  - If 'True', peak memory is measured for each run
+#                             (where 'tracemalloc' is available). ('True' by
+#                             default.)
+#              distribution - Name of the registered input distribution to use;
+#                             overrides 'mostlySorted' if given. ('None' by
+#                             default.)
+#              typecode     - If given, each test list is generated as a typed
+#                             array with this type code rather than a list.
+#                             ('None' by default.)
+#              instrumented - If 'False', the uninstrumented version of each
+#                             function is timed (see 'uninstrumented'), and
+#                             comparisons and swaps are not recorded. ('True'
+#                             by default.)
+#
+#     Outputs: A list of dictionaries, one per function and size, containing
+#              the median and 95th percentile of each metric along with the
+#              raw measurements of every run (under 'runs').
+#-------------------------------------------------------------------------------
+def benchmarkSortFunctions(functionList, sizes=None, repetitions=10, warmups=2,
+                           mostlySorted=False, trackMemory=True,
+                           distribution=None, typecode=None,
+                           instrumented=True):
+    if sizes is None:
+        sizes = [2 ** powerOfTwo for powerOfTwo in range(3, 13)]
+    if distribution is None:
+        if mostlySorted:
+            distribution = 'mostlySorted'
+        else:
+            distribution = 'random'
+    (createList, distributionName) = DISTRIBUTIONS[distribution]
+    if typecode:
+        createList = lambda n: createTypedArray(n, distribution, typecode)
+        container = "array('" + typecode + "')"
+    else:
+        container = 'list'
+
+    results = []
+    for function in functionList:
+        if instrumented:
+            sortFunction = function[0]
+        else:
+            sortFunction = uninstrumented(function[0])
+        for listSize in sizes:
+            for i in range(warmups):
+                sortFunction(createList(listSize))
+            runs = []
+            for i in range(repetitions):
+                testList = createList(listSize)
+                run = measureSortFunction(sortFunction, testList, trackMemory)
+                if not instrumented:
+                    run['comparisons'] = run['swaps'] = None
+                runs.append(run)
+            result = {'function':     function[1],
+                      'distribution': distributionName,
+                      'container':    container,
+                      'size':         listSize,
+                      'repetitions':  repetitions,
+                      'warmups':      warmups,
+                      'instrumented': instrumented,
+                      'runs':         runs}
+            for metric in BENCHMARK_METRICS:
+                values = [run[metric] for run in runs]
+                result['median' + metric[0].upper() + metric[1:]] = \
+                    median(values)
+                result['p95' + metric[0].upper() + metric[1:]] = \
+                    percentile(values, 95)
+            results.append(result)
+
+    return results
+
+#-------------------------------------------------------------------------------
+#    Function: writeBenchmarkResultsAsJson
+#
+# Description: Writes the results of 'benchmarkSortFunctions' (including the
+#              raw measurements of every run) to a JSON file, each tagged with
+#              the Python version and git commit (as in the history file), so
+#              that the file may be compared against other results.
+#
+#      Inputs: filename    - Desired name for the output file.
+#              results     - A list of results from 'benchmarkSortFunctions'.
+#              environment - A dictionary containing the 'pythonVersion' and
+#                            'commit' to be recorded (the current environment
+#                            by default).
+#
+#     Outputs: None. However, data is written to an output file.
+#-------------------------------------------------------------------------------
+def writeBenchmarkResultsAsJson(filename, results, environment=None):
+    if environment is None:
+        environment = getBenchmarkEnvironment()
+
+    records = []
+    for result in results:
+        record = dict(result)
+        record['pythonVersion'] = environment['pythonVersion']
+        record['commit'] = environment['commit']
+        records.append(record)
+    fout = open(filename, 'w')
+    json.dump(records, fout, indent=2, sort_keys=True)
+    fout.write('\n')
+    fout.close()
+
+#-------------------------------------------------------------------------------
+#    Function: writeBenchmarkResultsAsCsv
+#
+# Description: Writes the summarized results of 'benchmarkSortFunctions' to a
+#              CSV (comma-separated values) file, one row per function and list
+#              size. Raw per-run measurements are omitted.
+#
+#      Inputs: filename - Desired name for the output file.
+#              results  - A list of results from 'benchmarkSortFunctions'.
+#
+#     Outputs: None. However, data is written to an output file.
+#-------------------------------------------------------------------------------
+def writeBenchmarkResultsAsCsv(filename, results):
+    fout = open(filename, 'wb')
+    writer = csv.writer(fout)
+    writer.writerow(BENCHMARK_CSV_COLUMNS)
+    for result in results:
+        writer.writerow([result[column] for column in BENCHMARK_CSV_COLUMNS])
+    fout.close()
+
+#-------------------------------------------------------------------------------
+#    Function: fitScalingModels
+#
+# Description: Fits measured costs (e.g., comparisons or wall times) for a
+#              range of list sizes to each of the models in 'SCALING_MODELS'
+#              (cost = c * n, c * n log n, or c * n^2). Each coefficient is
+#              chosen to minimize the squared relative error, so small and large
+#              sizes carry equal weight, and models are ranked by their
+#              root-mean-square relative error. Sizes below 2 and non-positive
+#              costs are ignored.
+#
+#      Inputs: sizes - A list of list sizes.
+#              costs - A list of the corresponding measured costs.
+#
+#     Outputs: A list of tuples, each containing a model's name, its fitted
+#              coefficient, and its RMS relative error, ordered from best fit
+#              to worst (or an empty list if fewer than two points are usable).
+#-------------------------------------------------------------------------------
+def fitScalingModels(sizes, costs):
+    points = [(n, cost) for (n, cost) in zip(sizes, costs)
+              if n >= 2 and cost > 0]
+    if len(points) < 2:
+        return []
+
+    fits = []
+    for (name, model) in SCALING_MODELS:
+        ratios = [model(n) / float(cost) for (n, cost) in points]
+        coefficient = sum(ratios) / sum(ratio ** 2 for ratio in ratios)
+        error = math.sqrt(sum((coefficient * ratio - 1) ** 2
+                              for ratio in ratios) / len(ratios))
+        fits.append((name, coefficient, error))
+    fits.sort(key=lambda fit: fit[2])
+
+    return fits
+
+#-------------------------------------------------------------------------------
+#    Function: findScalingRegressions
+#
+# Description: Fits the results of 'benchmarkSortFunctions' for each function
+#              and distribution to the scaling models, and reports those whose
+#              best-fitting model differs from the expected one (e.g., a sort
+#              expected to be O(n log n) whose costs now grow like n^2).
+#
+#      Inputs: results        - A list of results from
+#                               'benchmarkSortFunctions'.
+#              expectedModels - A dictionary mapping function names, or
+#                               (function name, distribution label) tuples,
+#                               to the names of their expected models. The
+#                               latter take precedence; functions found in
+#                               neither are not checked.
+#              metric         - The result field to be fitted
+#                               ('medianComparisons' by default).
+#
+#     Outputs: A list of dictionaries, one per mismatch, containing the
+#              'function', 'distribution', 'expected' model, 'fitted' model,
+#              and all of the 'fits' (as returned by 'fitScalingModels').
+#-------------------------------------------------------------------------------
+def findScalingRegressions(results, expectedModels,
+                           metric='medianComparisons'):
+    groups = []
+    measurements = {}
+    for result in results:
+        group = (result['function'], result['distribution'])
+        if group not in measurements:
+            groups.append(group)
+            measurements[group] = ([], [])
+        measurements[group][0].append(result['size'])
+        measurements[group][1].append(result[metric])
+
+    regressions = []
+    for group in groups:
+        expected = expectedModels.get(group, expectedModels.get(group[0]))
+        if expected is None:
+            continue
+        fits = fitScalingModels(*measurements[group])
+        if fits and fits[0][0] != expected:
+            regressions.append({'function':     group[0],
+                                'distribution': group[1],
+                                'expected':     expected,
+                                'fitted':       fits[0][0],
+                                'fits':         fits})
+
+    return regressions
+
+#-------------------------------------------------------------------------------
+#    Function: getBenchmarkEnvironment
+#
+# Description: Identifies the environment in which benchmarks are being run,
+#              so that stored results can be told apart.
+#
+#      Inputs: None.
+#
+#     Outputs: A dictionary containing the 'pythonVersion' and the current git
+#              'commit' of this file's repository (or 'None' if it cannot be
+#              determined).
+#-------------------------------------------------------------------------------
+def getBenchmarkEnvironment():
+    try:
+        directory = os.path.dirname(os.path.abspath(__file__))
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                         cwd=directory,
+                                         stderr=open(os.devnull, 'w'))
+        commit = commit.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {'pythonVersion': platform.python_version(),
+            'commit':        commit}
+
+#-------------------------------------------------------------------------------
+#    Function: appendBenchmarkResults
+#
+# Description: Appends the results of 'benchmarkSortFunctions' (including the
+#              raw measurements of every run) to a JSON Lines file, one result
+#              per line, tagged with the Python version, git commit, and time
+#              at which they were recorded. Unlike the other output files, the
+#              history is never overwritten.
+#
+#      Inputs: filename    - Name of the history file
+#                            (BENCHMARK_HISTORY_FILE by default).
+#              results     - A list of results from 'benchmarkSortFunctions'.
+#              environment - A dictionary containing the 'pythonVersion' and
+#                            'commit' to be recorded (the current environment
+#                            by default).
+#
+#     Outputs: None. However, data is appended to the history file.
+#-------------------------------------------------------------------------------
+def appendBenchmarkResults(filename, results, environment=None):
+    if filename is None:
+        filename = BENCHMARK_HISTORY_FILE
+    if environment is None:
+        environment = getBenchmarkEnvironment()
+
+    timestamp = time.time()
+    fout = open(filename, 'a')
+    for result in results:
+        record = dict(result)
+        record['pythonVersion'] = environment['pythonVersion']
+        record['commit'] = environment['commit']
+        record['timestamp'] = timestamp
+        fout.write(json.dumps(record, sort_keys=True) + '\n')
+    fout.close()
+
+#-------------------------------------------------------------------------------
+#    Function: loadBenchmarkResults
+#
+# Description: Reads benchmark results from a JSON Lines history file (see
+#              'appendBenchmarkResults') or from a JSON file containing a list
+#              of results (see 'writeBenchmarkResultsAsJson'), optionally
+#              keeping only those recorded at a given commit.
+#
+#      Inputs: filename - Name of the results file (BENCHMARK_HISTORY_FILE by
+#                         default).
+#              commit   - If given, only results whose commit begins with this
+#                         string (e.g., an abbreviated hash) are returned.
+#                         ('None' by default.)
+#
+#     Outputs: A list of results, in the order in which they were recorded. If
+#              the file is not in either format, a ValueError is raised.
+#-------------------------------------------------------------------------------
+def loadBenchmarkResults(filename=None, commit=None):
+    if filename is None:
+        filename = BENCHMARK_HISTORY_FILE
+
+    fin = open(filename, 'r')
+    text = fin.read()
+    fin.close()
+    try:
+        if text.lstrip().startswith('['):
+            records = json.loads(text)
+        else:
+            records = [json.loads(line) for line in text.splitlines()
+                       if line.strip()]
+    except ValueError as error:
+        raise ValueError('"' + filename + '" is not a JSON or JSON Lines '
+                         'results file (' + str(error) + ')')
+    if not all(isinstance(record, dict) for record in records):
+        raise ValueError('"' + filename + '" does not contain a list of '
+                         'results')
+
+    results = []
+    for result in records:
+        if commit is None or (result.get('commit') or '').startswith(commit):
+            results.append(result)
+
+    return results
+
+#-------------------------------------------------------------------------------
+#    Function: mannWhitneyU
+#
+# Description: Performs a one-sided Mann-Whitney U test of whether values drawn
+#              from a second sample tend to be larger than those drawn from a
+#              first sample. The p-value is computed from the normal
+#              approximation to the distribution of U, with corrections for
+#              ties and continuity, which is adequate for samples of roughly
+#              eight or more values each.
+#
+#      Inputs: sample1 - A non-empty list of numbers (e.g., baseline timings).
+#              sample2 - A non-empty list of numbers (e.g., current timings).
+#
+#     Outputs: A tuple containing the U statistic of 'sample2' and the p-value
+#              for the hypothesis that 'sample2' tends to be larger.
+#-------------------------------------------------------------------------------
+def mannWhitneyU(sample1, sample2):
+    n1 = len(sample1)
+    n2 = len(sample2)
+    n = n1 + n2
+    values = sorted([(value, 0) for value in sample1] +
+                    [(value, 1) for value in sample2])
+
+    # Rank the combined samples, giving tied values their average rank:
+    rankSum = 0.0
+    tieCorrection = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and values[j + 1][0] == values[i][0]:
+            j += 1
+        rank = (i + j) / 2.0 + 1
+        ties = j - i + 1
+        tieCorrection += ties ** 3 - ties
+        for k in range(i, j + 1):
+            if values[k][1] == 1:
+                rankSum += rank
+        i = j + 1
+
+    u = rankSum - n2 * (n2 + 1) / 2.0
+    mean = n1 * n2 / 2.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - tieCorrection / (n * (n - 1.0)))
+    if variance <= 0:  # Every value is the same.
+        return (u, 0.5)
+    z = (u - mean - 0.5) / math.sqrt(variance)
+
+    return (u, 0.5 * math.erfc(z / math.sqrt(2)))
+
+#-------------------------------------------------------------------------------
+#    Function: getBenchmarkGroup
+#
+# Description: Gets the key by which 'compareBenchmarkResults' matches a
+#              baseline result with current results.
+#
+#      Inputs: result - A benchmark result.
+#
+#     Outputs: A tuple containing the result's function, distribution,
+#              container, list size, Python version, and instrumentation.
+#-------------------------------------------------------------------------------
+def getBenchmarkGroup(result):
+    return (result['function'], result['distribution'], result['container'],
+            result['size'], result.get('pythonVersion'),
+            result.get('instrumented', True))
+
+#-------------------------------------------------------------------------------
+#    Function: findUnmatchedBenchmarkResults
+#
+# Description: Finds the baseline results that 'compareBenchmarkResults' could
+#              not compare, because no current result matches them.
+#
+#      Inputs: baseline - A list of baseline results.
+#              current  - A list of current results.
+#
+#     Outputs: A list of the keys (see 'getBenchmarkGroup') of the unmatched
+#              baseline results, in the order in which they were recorded.
+#-------------------------------------------------------------------------------
+def findUnmatchedBenchmarkResults(baseline, current):
+    currentGroups = set(getBenchmarkGroup(result) for result in current)
+    unmatched = []
+    for result in baseline:
+        group = getBenchmarkGroup(result)
+        if group not in currentGroups and group not in unmatched:
+            unmatched.append(group)
+
+    return unmatched
+
+#-------------------------------------------------------------------------------
+#    Function: compareBenchmarkResults
+#
+# Description: Compares current benchmark results against baseline results,
+#              matching them by function, distribution, container, list size,
+#              Python version, and instrumentation. Statistically significant
+#              slowdowns are reported. The raw per-run measurements of all
+#              matching results are pooled, so repeated benchmark runs
+#              strengthen the test.
+#
+#      Inputs: baseline  - A list of baseline results.
+#              current   - A list of current results.
+#              metric    - The per-run measurement to be compared ('wallTime'
+#                          by default).
+#              alpha     - Significance level of the Mann-Whitney U test
+#                          (REGRESSION_SIGNIFICANCE by default).
+#              threshold - Minimum ratio of current to baseline medians to be
+#                          reported, so that trivial but consistent slowdowns
+#                          are ignored (REGRESSION_THRESHOLD by default).
+#
+#     Outputs: A list of dictionaries, one per regression, containing the
+#              'function', 'distribution', 'container', 'size',
+#              'pythonVersion', 'baselineMedian', 'currentMedian', 'ratio', and
+#              'pValue'.
+#-------------------------------------------------------------------------------
+def compareBenchmarkResults(baseline, current, metric='wallTime', alpha=None,
+                            threshold=None):
+    if alpha is None:
+        alpha = REGRESSION_SIGNIFICANCE
+    if threshold is None:
+        threshold = REGRESSION_THRESHOLD
+
+    groups = []
+    samples = {}
+    for (index, results) in enumerate([baseline, current]):
+        for result in results:
+            group = getBenchmarkGroup(result)
+            if group not in samples:
+                groups.append(group)
+                samples[group] = ([], [])
+            samples[group][index].extend(run[metric] for run in result['runs']
+                                         if run[metric] is not None)
+
+    regressions = []
+    for group in groups:
+        (before, after) = samples[group]
+        if not before or not after:
+            continue
+        baselineMedian = median(before)
+        currentMedian = median(after)
+        if baselineMedian > 0:
+            ratio = currentMedian / float(baselineMedian)
+        elif currentMedian > 0:
+            ratio = float('inf')
+        else:
+            ratio = 1.0
+        pValue = mannWhitneyU(before, after)[1]
+        if pValue < alpha and ratio >= threshold:
+            regressions.append({'function':       group[0],
+                                'distribution':   group[1],
+                                'container':      group[2],
+                                'size':           group[3],
+                                'pythonVersion':  group[4],
+                                'baselineMedian': baselineMedian,
+                                'currentMedian':  currentMedian,
+                                'ratio':          ratio,
+                                'pValue':         pValue})
+
+    return regressions
+
+#-------------------------------------------------------------------------------
+#    Function: parseByteCount
+#
+# Description: Parses a number of bytes given on the command line, optionally
+#              followed by a 'K', 'M', or 'G' suffix (powers of 1024).
+#
+#      Inputs: text - The text to be parsed (e.g., '512M').
+#
+#     Outputs: The number of bytes, as an integer.
+#-------------------------------------------------------------------------------
+def parseByteCount(text):
+    multipliers = {'K': 2 ** 10, 'M': 2 ** 20, 'G': 2 ** 30}
+    multiplier = multipliers.get(text[-1:].upper())
+    if multiplier is None:
+        multiplier = 1
+    else:
+        text = text[:-1]
+    try:
+        count = int(text) * multiplier
+    except ValueError:
+        count = 0
+    if count < 1:
+        raise argparse.ArgumentTypeError('invalid size: ' + repr(text))
+
+    return count
+
+#-------------------------------------------------------------------------------
+#    Function: sortCommand
+#
+# Description: A command-line tool, similar to the Unix 'sort' utility, that
+#              sorts the lines (or integers) of the given files, or of
+#              standard input, via one of this module's sort functions. Input
+#              is streamed through 'externalSort', so it is sorted in memory if
+#              it fits within the memory cap and spilled to disk in sorted runs
+#              otherwise. Output is written in large buffered batches.
+#
+#      Inputs: arguments - A list of command-line arguments (e.g.,
+#                          ['--algo', 'quick', '-n', 'numbers.txt']).
+#
+#     Outputs: An exit status: 0 on success, 2 on error.
+#-------------------------------------------------------------------------------
+def sortCommand(arguments):
+    algorithms = {'bubble':    optimizedBubbleSort,
+                  'shaker':    optimizedShakerSort,
+                  'selection': selectionSort,
+                  'quick':     quickSort,
+                  'quick3':    threeWayQuickSort,
+                  'mquick':    modifiedQuickSort,
+                  'intro':     introSort,
+                  'merge':     mergeSort,
+                  'bumerge':   bottomUpMergeSort,
+                  'tim':       timSort,
+                  'heap':      heapSort,
+                  'shell':     shellSort,
+                  'integer':   integerSort,
+                  'counting':  countingSort,
+                  'radix':     radixSort,
+                  'parallel':  parallelSort}
+
+    parser = argparse.ArgumentParser(
+        prog='sort_functions.py sort',
+        description='Sort lines of text (or integers) from files or standard '
+                    'input.')
+    parser.add_argument('files', nargs='*', metavar='FILE',
+                        help="input files ('-' or none for standard input)")
+    parser.add_argument('--algo', choices=sorted(algorithms), default='tim',
+                        help="sort function to use (default: 'tim')")
+    parser.add_argument('-n', '--numeric', action='store_true',
+                        help='sort lines as integers; blank lines are ignored')
+    parser.add_argument('-u', '--unique', action='store_true',
+                        help='output only the first of each run of equal '
+                             'lines')
+    parser.add_argument('-S', '--memory-cap', type=parseByteCount,
+                        default=EXTERNAL_SORT_MEMORY_BUDGET, metavar='SIZE',
+                        help='memory to use before spilling sorted runs to '
+                             'disk, e.g. 512M (default: 64M)')
+    parser.add_argument('-T', '--temporary-directory', metavar='DIR',
+                        help='directory for spilled runs')
+    parser.add_argument('-o', '--output', metavar='FILE',
+                        help='write to FILE instead of standard output')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='record the phases of each sort and write them '
+                             'to FILE, as Chrome trace JSON if FILE ends in '
+                             "'.json' and as collapsed stacks otherwise")
+    options = parser.parse_args(arguments)
+
+    sortFunction = algorithms[options.algo]
+    if sortFunction.__name__ in INTEGER_SORT_FUNCTION_NAMES and \
+       not options.numeric:
+        print >>sys.stderr, 'Error: --algo', options.algo, 'requires -n'
+        return 2
+
+    tracer = None
+    if options.trace:
+        tracer = SortTracer()
+        tracer.start()
+        sortFunction = tracer.wrap(sortFunction)
+
+    fins = []
+    try:
+        try:
+            for filename in options.files or ['-']:
+                if filename == '-':
+                    fins.append(sys.stdin)
+                else:
+                    fins.append(open(filename, 'r'))
+            if options.output:
+                fout = open(options.output, 'w', OUTPUT_BUFFER_SIZE)
+            else:
+                fout = os.fdopen(os.dup(sys.stdout.fileno()), 'w',
+                                 OUTPUT_BUFFER_SIZE)
+            externalSort(itertools.chain(*fins), fout, sortFunction,
+                         options.memory_cap, numeric=options.numeric,
+                         tempDir=options.temporary_directory,
+                         unique=options.unique)
+            fout.close()
+        except ValueError as error:
+            print >>sys.stderr, 'Error:', error
+            return 2
+        except IOError as error:
+            if error.errno == errno.EPIPE:  # The reader has gone away.
+                return 0
+            print >>sys.stderr, 'Error:', error
+            return 2
+    finally:
+        for fin in fins:
+            if fin is not sys.stdin:
+                fin.close()
+        if tracer:
+            tracer.stop()
+
+    if tracer:
+        if options.trace.endswith('.json'):
+            tracer.writeChromeTrace(options.trace)
+        else:
+            tracer.writeCollapsedStacks(options.trace)
+
+    return 0
+
 
 def main():
     sys.setrecursionlimit(100000)
 
     sortFunctions = [(bubbleSort, 'Bubble'),
+                     (optimizedBubbleSort, 'OBubble'),
                      (shakerSort, 'Shaker'),
+                     (optimizedShakerSort, 'OShaker'),
                      (selectionSort, 'Selection'),
                      (quickSort, 'Quick'),
                      (modifiedQuickSort, 'MQuick'),
                      (mergeSort, 'Merge'),
-                     (hashSort, 'Hash')]
+                     (hashSort, 'Hash'),
+                     (introSort, 'Intro'),
+                     (threeWayQuickSort, 'Quick3'),
+                     (bottomUpMergeSort, 'BUMerge'),
+                     (timSort, 'Tim'),
+                     (integerSort, 'Integer'),
+                     (heapSort, 'Heap'),
+                     (shellSort, 'Shell')]
+
+    # Expected growth in comparisons on random data:
+    expectedModels = {('Bubble', 'Random'):    'n^2',
+                      ('OBubble', 'Random'):   'n^2',
+                      ('Shaker', 'Random'):    'n^2',
+                      ('OShaker', 'Random'):   'n^2',
+                      ('Selection', 'Random'): 'n^2',
+                      ('Quick', 'Random'):     'n log n',
+                      ('MQuick', 'Random'):    'n log n',
+                      ('Merge', 'Random'):     'n log n',
+                      ('Hash', 'Random'):      'n',
+                      ('Intro', 'Random'):     'n log n',
+                      ('Quick3', 'Random'):    'n log n',
+                      ('BUMerge', 'Random'):   'n log n',
+                      ('Tim', 'Random'):       'n log n',
+                      ('Integer', 'Random'):   'n',
+                      ('Heap', 'Random'):      'n log n',
+                      ('Shell', 'Random'):     'n log n'}
 
-    storePerformanceDataForMultipleSortFunctions('a.csv', sortFunctions, 10)
+    if len(sys.argv) > 1 and sys.argv[1] == 'benchmark':
+        results = benchmarkSortFunctions(sortFunctions)
+        results += benchmarkSortFunctions(sortFunctions, mostlySorted=True)
+        environment = getBenchmarkEnvironment()
+        writeBenchmarkResultsAsJson('benchmark.json', results, environment)
+        writeBenchmarkResultsAsCsv('benchmark.csv', results)
+        appendBenchmarkResults(BENCHMARK_HISTORY_FILE, results, environment)
+        for result in measureParallelSpeedup(2 ** 20):
+            print 'Parallel sort with', result['processes'], 'process(es):', \
+                  result['wallTime'], 'seconds,', result['speedup'], 'speedup'
+        for regression in findScalingRegressions(results, expectedModels):
+            print 'Warning: comparisons for', regression['function'], 'on', \
+                  regression['distribution'], 'data grow like', \
+                  regression['fitted'], '(expected ' + \
+                  regression['expected'] + ')'
+    elif len(sys.argv) > 1 and sys.argv[1] == 'sort':
+        sys.exit(sortCommand(sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'compare':
+        # Usage: compare BASELINE [CURRENT], where each is either a saved
+        # results file or a commit recorded in the history file (by default,
+        # CURRENT is the most recently recorded commit):
+        if len(sys.argv) not in (3, 4):
+            print 'Usage: ' + sys.argv[0] + ' compare BASELINE [CURRENT]'
+            sys.exit(2)
+        specifications = sys.argv[2:4]
+        try:
+            if len(specifications) < 2:
+                history = loadBenchmarkResults()
+                if not history:
+                    print 'Error: no results in', BENCHMARK_HISTORY_FILE
+                    sys.exit(2)
+                specifications.append(history[-1]['commit'] or '')
+            (baseline, current) = [loadBenchmarkResults(specification)
+                                   if os.path.isfile(specification)
+                                   else loadBenchmarkResults(None,
+                                                             specification)
+                                   for specification in specifications]
+        except (IOError, ValueError) as error:
+            print 'Error:', error
+            sys.exit(2)
+        if not baseline or not current:
+            print 'Error: no results found for', \
+                  specifications[0] if not baseline else specifications[1]
+            sys.exit(2)
+        unmatched = findUnmatchedBenchmarkResults(baseline, current)
+        for group in unmatched:
+            print 'Error: no current results for', group[0], 'on', \
+                  group[1], 'data (' + group[2] + ', n = ' + str(group[3]) + \
+                  ', Python ' + str(group[4]) + \
+                  (')' if group[5] else ', uninstrumented)')
+        if unmatched:
+            sys.exit(2)
+        regressions = compareBenchmarkResults(baseline, current)
+        for regression in regressions:
+            print 'Regression:', regression['function'], 'on', \
+                  regression['distribution'], 'data (' + \
+                  regression['container'] + ', n = ' + \
+                  str(regression['size']) + ') is', \
+                  '%.2fx slower' % regression['ratio'], \
+                  '(p = %.4f)' % regression['pValue']
+        if regressions:
+            sys.exit(1)
+        print 'No significant regressions.'
+    else:
+        storePerformanceDataForMultipleSortFunctions('a.csv', sortFunctions,
+                                                     10)
 
 ##    listSize       = 3
 ##    testIterations = 100